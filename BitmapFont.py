@@ -0,0 +1,259 @@
+"""
+BDF / PCF bitmap font import.
+
+Some display fonts already exist as hand-tuned bitmap fonts; pushing them through
+TTF rendering, resize and threshold is slow and lossy. `import_bitmap_font` reads
+a BDF (text) or PCF (X11 binary, optionally gzip-compressed) file and returns the
+{char: [[row bytes], ...]} dict `generate_xbm_data` returns, so `write_xbm`,
+`write_mif`, `pack_glyphs` and the combined-binary assemblers take it unchanged.
+Nothing is rasterized or resampled: the glyph bitmaps are copied bit for bit.
+
+Glyphs are placed with the same canvas rules as `generate_xbm_data`
+(`place_glyph`): by default the ink box of each glyph, like the TTF path does.
+With `keep_baseline` the glyph is placed inside a common cell (the union of the
+boxes of the requested glyphs) instead, keeping the designer's baseline and side
+bearings; a cell that does not fit the canvas raises ValueError, since no glyph
+could be placed. The space is always a blank canvas; glyphs that are missing,
+blank or (with ink-box placement) do not fit the canvas are skipped with a warning.
+
+Encodings are taken as Unicode code points, which holds for ISO10646-1 and
+ISO8859-1 fonts (the CHARSET_REGISTRY is checked).
+"""
+import gzip
+import os
+import struct
+import time
+
+import numpy as np
+
+from Glyphs import canvas_rows, glyph_order, place_glyph
+
+UNICODE_REGISTRIES = {"ISO10646", "ISO8859"}
+
+# PCF table types and format bits (X11 pcf.h)
+PCF_MAGIC = b"\x01fcp"
+PCF_PROPERTIES = 1 << 0
+PCF_METRICS = 1 << 2
+PCF_BITMAPS = 1 << 3
+PCF_BDF_ENCODINGS = 1 << 5
+PCF_GLYPH_PAD_MASK = 3
+PCF_BYTE_MASK = 1 << 2
+PCF_BIT_MASK = 1 << 3
+PCF_SCAN_UNIT_MASK = 3 << 4
+PCF_COMPRESSED_METRICS = 0x100
+PCF_NO_GLYPH = 0xFFFF
+
+
+def _glyph(bitmap, width, height, x_offset, y_offset):
+    """A glyph record: 0/1 (height, width) bitmap with its BDF-style BBX offsets."""
+    return {"bitmap": np.asarray(bitmap, dtype=np.uint8).reshape(height, width),
+            "x_offset": x_offset, "y_offset": y_offset}
+
+
+def read_bdf(data):
+    """Parses BDF text (bytes); returns {"properties": {...}, "glyphs": {code point: glyph}}."""
+    properties = {}
+    glyphs = {}
+    lines = iter(data.decode("latin-1").splitlines())
+    in_properties = False
+    for line in lines:
+        keyword, _, value = line.strip().partition(" ")
+        if keyword == "STARTPROPERTIES":
+            in_properties = True
+        elif keyword == "ENDPROPERTIES":
+            in_properties = False
+        elif in_properties and keyword:
+            properties[keyword] = value.strip().strip('"')
+        elif keyword == "STARTCHAR":
+            encoding = -1
+            bbx = None
+            for line in lines:
+                keyword, _, value = line.strip().partition(" ")
+                if keyword == "ENCODING":
+                    encoding = int(value.split()[0])
+                elif keyword == "BBX":
+                    bbx = [int(field) for field in value.split()]
+                elif keyword == "BITMAP":
+                    break
+            if bbx is None:
+                raise ValueError(f"BDF glyph {encoding} has no BBX")
+            width, height, x_offset, y_offset = bbx
+            rows = []
+            for line in lines:
+                line = line.strip()
+                if line == "ENDCHAR":
+                    break
+                rows.append(bytes.fromhex(line))
+            row_bytes = (width + 7) // 8
+            packed = np.frombuffer(b"".join(row[:row_bytes].ljust(row_bytes, b"\0") for row in rows[:height]),
+                                   dtype=np.uint8).reshape(-1, row_bytes)
+            bitmap = np.unpackbits(packed, axis=1)[:, :width]
+            if bitmap.shape[0] < height:
+                bitmap = np.vstack([bitmap, np.zeros((height - bitmap.shape[0], width), dtype=np.uint8)])
+            if encoding >= 0:
+                glyphs[encoding] = _glyph(bitmap, width, height, x_offset, y_offset)
+    return {"properties": properties, "glyphs": glyphs}
+
+
+def _pcf_tables(data):
+    if data[:4] != PCF_MAGIC:
+        raise ValueError("Not a PCF font")
+    (count,) = struct.unpack_from("<i", data, 4)
+    tables = {}
+    for i in range(count):
+        table_type, table_format, size, offset = struct.unpack_from("<iiii", data, 8 + 16 * i)
+        tables[table_type] = (table_format, offset)
+    return tables
+
+
+def _pcf_table(data, tables, table_type):
+    """Returns (format, byte order prefix, offset after the format word) of a table."""
+    if table_type not in tables:
+        raise ValueError(f"PCF font has no table {table_type}")
+    _, offset = tables[table_type]
+    (table_format,) = struct.unpack_from("<i", data, offset)
+    return table_format, ">" if table_format & PCF_BYTE_MASK else "<", offset + 4
+
+
+def read_pcf(data):
+    """Parses a PCF font (bytes); returns the same structure as `read_bdf`."""
+    tables = _pcf_tables(data)
+
+    properties = {}
+    if PCF_PROPERTIES in tables:
+        _, order, offset = _pcf_table(data, tables, PCF_PROPERTIES)
+        (count,) = struct.unpack_from(order + "i", data, offset)
+        entries = [struct.unpack_from(order + "ibi", data, offset + 4 + 9 * i) for i in range(count)]
+        strings_offset = offset + 4 + 9 * count + (4 - (count & 3)) % 4 + 4
+
+        def string_at(position):
+            start = strings_offset + position
+            return data[start:data.index(b"\0", start)].decode("latin-1")
+
+        for name, is_string, value in entries:
+            properties[string_at(name)] = string_at(value) if is_string else str(value)
+
+    table_format, order, offset = _pcf_table(data, tables, PCF_METRICS)
+    if table_format & PCF_COMPRESSED_METRICS:
+        (count,) = struct.unpack_from(order + "h", data, offset)
+        fields = np.frombuffer(data, dtype=np.uint8, count=5 * count, offset=offset + 2).reshape(count, 5)
+        metrics = fields.astype(np.int32) - 0x80
+    else:
+        (count,) = struct.unpack_from(order + "i", data, offset)
+        fields = np.frombuffer(data, dtype=np.dtype(order + "i2"), count=6 * count, offset=offset + 4)
+        metrics = fields.reshape(count, 6)[:, :5].astype(np.int32)
+    left_bearing, right_bearing, _, ascent, descent = metrics.T
+
+    table_format, order, offset = _pcf_table(data, tables, PCF_BITMAPS)
+    (count,) = struct.unpack_from(order + "i", data, offset)
+    glyph_offsets = np.frombuffer(data, dtype=np.dtype(order + "i4"), count=count, offset=offset + 4)
+    sizes = struct.unpack_from(order + "4i", data, offset + 4 + 4 * count)
+    bitmap_data = np.frombuffer(data, dtype=np.uint8, count=sizes[table_format & PCF_GLYPH_PAD_MASK],
+                                offset=offset + 4 + 4 * count + 16)
+    row_pad = 1 << (table_format & PCF_GLYPH_PAD_MASK)
+    scan_unit = 1 << ((table_format & PCF_SCAN_UNIT_MASK) >> 4)
+    if bool(table_format & PCF_BYTE_MASK) != bool(table_format & PCF_BIT_MASK) and scan_unit > 1:
+        # As in pcfread.c: scan units are byte-swapped when byte and bit order differ
+        bitmap_data = bitmap_data.reshape(-1, scan_unit)[:, ::-1].reshape(-1)
+    bit_order = "big" if table_format & PCF_BIT_MASK else "little"
+
+    table_format, order, offset = _pcf_table(data, tables, PCF_BDF_ENCODINGS)
+    min_byte2, max_byte2, min_byte1, max_byte1, _ = struct.unpack_from(order + "5h", data, offset)
+    columns = max_byte2 - min_byte2 + 1
+    indices = np.frombuffer(data, dtype=np.dtype(order + "u2"), count=columns * (max_byte1 - min_byte1 + 1),
+                            offset=offset + 10)
+
+    glyphs = {}
+    for position in np.flatnonzero(indices != PCF_NO_GLYPH):
+        index = int(indices[position])
+        encoding = ((min_byte1 + position // columns) << 8) | (min_byte2 + position % columns)
+        width = int(right_bearing[index] - left_bearing[index])
+        height = int(ascent[index] + descent[index])
+        row_bytes = (width + row_pad * 8 - 1) // (row_pad * 8) * row_pad
+        start = int(glyph_offsets[index])
+        rows = bitmap_data[start:start + row_bytes * height].reshape(height, row_bytes)
+        bitmap = np.unpackbits(rows, axis=1, bitorder=bit_order)[:, :width]
+        glyphs[int(encoding)] = _glyph(bitmap, width, height, int(left_bearing[index]), int(-descent[index]))
+    return {"properties": properties, "glyphs": glyphs}
+
+
+def read_bitmap_font(path):
+    """Reads a .bdf, .pcf or .pcf.gz file (detected by content)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+    font = read_pcf(data) if data[:4] == PCF_MAGIC else read_bdf(data)
+    registry = font["properties"].get("CHARSET_REGISTRY", "ISO10646").upper()
+    if registry not in UNICODE_REGISTRIES:
+        print(f"Warning: {os.path.basename(path)} uses the {registry} charset; encodings are read as Unicode")
+    return font
+
+
+def font_cell(glyphs):
+    """(left, bottom, width, height) of the union of the boxes of `glyphs` (glyph records), BDF-style."""
+    boxes = [(g["x_offset"], g["y_offset"], g["x_offset"] + g["bitmap"].shape[1], g["y_offset"] + g["bitmap"].shape[0])
+             for g in glyphs if g["bitmap"].size]
+    if not boxes:
+        raise ValueError("No glyph boxes to build a cell from")
+    left = min(box[0] for box in boxes)
+    bottom = min(box[1] for box in boxes)
+    return left, bottom, max(box[2] for box in boxes) - left, max(box[3] for box in boxes) - bottom
+
+
+def import_bitmap_font(path, char_list, canvas_width, canvas_height, padding_top=0, keep_baseline=False):
+    """
+    Imports `char_list` from a BDF/PCF font as a `generate_xbm_data` style dict
+    (see the module docstring for the placement).
+    """
+    start = time.perf_counter()
+    glyphs = read_bitmap_font(path)["glyphs"]
+    selected = {}
+    for char in glyph_order(char_list):
+        if char == " ":
+            selected[char] = None
+            continue
+        glyph = glyphs.get(ord(char))
+        if glyph is None or not glyph["bitmap"].any():
+            print(f"Warning: No bitmap for character '{char}' in {os.path.basename(path)}")
+            continue
+        selected[char] = glyph
+
+    requested = [glyph for glyph in selected.values() if glyph is not None]
+    if keep_baseline and requested:
+        cell_left, cell_bottom, cell_width, cell_height = font_cell(requested)
+        # Every glyph uses the same cell, so it either fits the canvas or none does
+        try:
+            place_glyph(np.zeros((cell_height, cell_width)), canvas_width, canvas_height, padding_top)
+        except ValueError:
+            raise ValueError(f"The {cell_width}x{cell_height} baseline cell of the requested glyphs does not fit "
+                             f"the {canvas_width}x{canvas_height} canvas (padding_top {padding_top}); import "
+                             f"without keep_baseline or request fewer glyphs") from None
+
+    blank = [[0x00] * (canvas_width // 8) for _ in range(canvas_height)]
+    all_xbm_data = {}
+    for char, glyph in selected.items():
+        if glyph is None:
+            all_xbm_data[char] = [row[:] for row in blank]
+            continue
+        bitmap = glyph["bitmap"]
+        if keep_baseline:
+            cell = np.zeros((cell_height, cell_width), dtype=np.uint8)
+            height, width = bitmap.shape
+            top = cell_height - (glyph["y_offset"] - cell_bottom) - height
+            left = glyph["x_offset"] - cell_left
+            cell[top:top + height, left:left + width] = bitmap
+            bitmap = cell
+        else:
+            rows = np.flatnonzero(bitmap.any(axis=1))
+            columns = np.flatnonzero(bitmap.any(axis=0))
+            bitmap = bitmap[rows[0]:rows[-1] + 1, columns[0]:columns[-1] + 1]
+        try:
+            all_xbm_data[char] = canvas_rows(place_glyph(bitmap, canvas_width, canvas_height, padding_top)).tolist()
+        except ValueError as e:
+            print(f"Warning: Unable to process character '{char}'. Reason: {e}")
+
+    seconds = time.perf_counter() - start
+    print(f"✅ Imported {len(all_xbm_data)} of {len(glyph_order(char_list))} glyphs from {os.path.basename(path)} "
+          f"in {seconds * 1000:.1f} ms")
+    return all_xbm_data
@@ -0,0 +1,110 @@
+"""
+Exports an assembled ROM image as a C header for firmware that compiles the font
+into flash instead of reading an external ROM.
+
+The header holds the image as a `const uint8_t[]`, #defines for every section of
+the combined layout, a character-to-offset table and the image checksums. Bytes
+are formatted with a lookup table over the whole image (no per-byte Python string
+formatting) and written in blocks, so multi-megabyte images export quickly and the
+output only depends on the input.
+"""
+import os
+import zlib
+
+import numpy as np
+
+from Rom import STRIKEOUT_ADDRESS_32X64, byte_sum_checksum, section_ranges
+
+BYTES_PER_LINE = 16
+LINES_PER_BLOCK = 4096
+
+# "0xNN, " for every byte value, as a (256, 6) uint8 matrix
+_BYTE_TOKENS = np.frombuffer("".join(f"0x{value:02X}, " for value in range(256)).encode("ascii"),
+                             dtype=np.uint8).reshape(256, 6)
+_INDENT = np.frombuffer(b"    ", dtype=np.uint8)
+
+
+def format_c_bytes(data, bytes_per_line=BYTES_PER_LINE):
+    """Formats bytes as indented C initializer lines ("    0x00, 0x01, ...,\\n")."""
+    data = np.frombuffer(bytes(data), dtype=np.uint8)
+    if data.size == 0:
+        return b""
+    line_count = -(-data.size // bytes_per_line)
+    tokens = np.zeros((line_count * bytes_per_line, 6), dtype=np.uint8)
+    tokens[:data.size] = _BYTE_TOKENS[data]
+    lines = tokens.reshape(line_count, bytes_per_line * 6)
+    lines = np.hstack([np.broadcast_to(_INDENT, (line_count, _INDENT.size)), lines])
+    # The trailing space of each line becomes its newline
+    lines[:, -1] = ord("\n")
+    text = lines.tobytes()
+    remainder = data.size % bytes_per_line
+    if remainder:
+        last_line = _INDENT.size + remainder * 6
+        text = text[:-lines.shape[1]] + text[-lines.shape[1]:][:last_line - 1] + b"\n"
+    return text
+
+
+def _c_name(name):
+    return "".join(c if c.isalnum() else "_" for c in name).upper()
+
+
+def write_c_header(image, output_file, chars_16x32=None, chars_32x64=None, symbol="font_rom"):
+    """
+    Writes `image` as a C header. When the glyph character lists are given (the
+    `chars` from `pack_glyphs`), a sorted code point to glyph offset table is added.
+    """
+    guard = _c_name(os.path.basename(output_file))
+    prefix = symbol.upper()
+    lines = [
+        "/* Font ROM image, generated by CExport.py */",
+        f"#ifndef {guard}",
+        f"#define {guard}",
+        "",
+        "#include <stdint.h>",
+        "",
+        f"#define {prefix}_SIZE {len(image)}u",
+        f"#define {prefix}_BYTE_SUM 0x{byte_sum_checksum(image[:-2]):04X}u  /* stored little-endian in the last 2 bytes */",
+        f"#define {prefix}_CRC32 0x{zlib.crc32(image):08X}u",
+        "",
+    ]
+    for name, (start, end) in section_ranges(len(image)).items():
+        lines.append(f"#define {prefix}_{_c_name(name)}_OFFSET 0x{start:05X}u")
+        lines.append(f"#define {prefix}_{_c_name(name)}_LENGTH {end - start}u")
+        lines.append(f"#define {prefix}_{_c_name(name)} ({symbol} + {prefix}_{_c_name(name)}_OFFSET)")
+    lines += [
+        "/* 32x64 strikeout copies start this many bytes into the High and Low sections */",
+        f"#define {prefix}_32X64_STRIKEOUT_DELTA 0x{STRIKEOUT_ADDRESS_32X64 * 2:04X}u",
+        "",
+    ]
+
+    if chars_16x32 is not None and chars_32x64 is not None:
+        slots_16x32 = {char: i for i, char in enumerate(chars_16x32)}
+        slots_32x64 = {char: i for i, char in enumerate(chars_32x64)}
+        entries = sorted(set(slots_16x32) | set(slots_32x64), key=ord)
+        lines += [
+            "/* Glyph byte offsets within the 16x32 Normal and 32x64 High/Low sections, 0xFFFF if absent */",
+            "typedef struct {",
+            "    uint32_t code_point;",
+            "    uint16_t offset_16x32;",
+            "    uint16_t offset_32x64;",
+            f"}} {symbol}_char_t;",
+            "",
+            f"#define {prefix}_CHAR_COUNT {len(entries)}u",
+            f"static const {symbol}_char_t {symbol}_chars[{prefix}_CHAR_COUNT] = {{",
+        ]
+        for char in entries:
+            offset_16x32 = slots_16x32[char] * 64 if char in slots_16x32 else 0xFFFF
+            offset_32x64 = slots_32x64[char] * 128 if char in slots_32x64 else 0xFFFF
+            lines.append(f"    {{ 0x{ord(char):05X}, 0x{offset_16x32:04X}, 0x{offset_32x64:04X} }},")
+        lines += ["};", ""]
+
+    with open(output_file, "wb") as f:
+        f.write("\n".join(lines).encode("utf-8"))
+        f.write(f"\nstatic const uint8_t {symbol}[{prefix}_SIZE] = {{\n".encode("ascii"))
+        block_size = BYTES_PER_LINE * LINES_PER_BLOCK
+        for start in range(0, len(image), block_size):
+            f.write(format_c_bytes(image[start:start + block_size]))
+        f.write(f"}};\n\n#endif /* {guard} */\n".encode("ascii"))
+
+    print(f"C header saved as {output_file} ({len(image)} bytes"
+          f"{', char table' if chars_16x32 is not None else ''})")
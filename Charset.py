@@ -0,0 +1,181 @@
+"""
+Character set extraction from UI string catalogs.
+
+Instead of the hardcoded `char_list` in `generate_files`, the set of characters a
+product variant needs is computed from its string catalogs:
+
+  - JSON: every string value (nested objects and lists included); keys are ignored
+  - CSV:  every cell below the header row except the first (message key) column,
+          or only the named `columns`
+  - PO:   every msgstr (plural forms and continuation lines included), except
+          the catalog header entry
+
+The result is in code point order and always contains the space, which the ROM
+uses as its blank glyph. `font_coverage` reports which characters the font lacks
+before any glyph is rendered.
+"""
+import ast
+import csv
+import json
+import os
+import re
+
+from PIL import Image, ImageDraw, ImageFont
+
+from Glyphs import DEFAULT_CHAR_LIST, glyph_order
+from Rom import BANK_SLOTS
+
+# Formatting placeholders are not drawn, their surrounding text is
+PLACEHOLDER_PATTERN = re.compile(r"%(?:\([^)]*\))?[-+ #0]*\d*(?:\.\d+)?[sdifxXc%]|\{[^{}]*\}")
+PO_STRING_PATTERN = re.compile(r'^(msgid|msgid_plural|msgstr(?:\[\d+\])?|msgctxt)?\s*("(?:[^"\\]|\\.)*")\s*$')
+
+# A code point no font maps, used to recognise the font's .notdef glyph
+NOTDEF_PROBE = "\U0010FFFD"
+
+
+def strings_from_json(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    def walk(value):
+        if isinstance(value, str):
+            yield value
+        elif isinstance(value, dict):
+            for item in value.values():
+                yield from walk(item)
+        elif isinstance(value, list):
+            for item in value:
+                yield from walk(item)
+
+    return list(walk(data))
+
+
+def strings_from_csv(path, columns=None):
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if columns is None:
+            rows = csv.reader(f)
+            next(rows, None)
+            # The first column holds the message keys, not UI text
+            return [cell for row in rows for cell in row[1:]]
+        return [row[column] for row in csv.DictReader(f) for column in columns if row.get(column)]
+
+
+def strings_from_po(path):
+    """Returns the translated strings (msgstr) of a gettext PO file."""
+    strings = []
+    entry = {}
+    keyword, parts = None, []
+
+    def flush():
+        if keyword is not None:
+            entry[keyword] = "".join(parts)
+            # The header entry (empty msgid, no context) holds metadata, not UI text
+            if keyword.startswith("msgstr") and (entry.get("msgid") != "" or "msgctxt" in entry):
+                strings.append(entry[keyword])
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            match = PO_STRING_PATTERN.match(line)
+            if not match:
+                raise ValueError(f"Unexpected line in {path}: {line!r}")
+            if match.group(1):
+                flush()
+                # msgctxt or a msgid without one starts a new entry
+                if match.group(1) == "msgctxt" or (match.group(1) == "msgid" and keyword != "msgctxt"):
+                    entry = {}
+                keyword, parts = match.group(1), []
+            parts.append(ast.literal_eval(match.group(2)))
+    flush()
+    return strings
+
+
+CATALOG_READERS = {
+    ".json": strings_from_json,
+    ".csv": strings_from_csv,
+    ".po": strings_from_po,
+}
+
+
+def catalog_strings(path, **options):
+    """Reads the UI strings of one catalog, chosen by file extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in CATALOG_READERS:
+        raise ValueError(f"Unsupported catalog type '{extension}' for {path}")
+    return CATALOG_READERS[extension](path, **options)
+
+
+def extract_charset(paths, strip_placeholders=True, csv_columns=None):
+    """
+    Returns the characters used by the catalogs in `paths`, in code point order.
+    Control characters (newlines, tabs) are dropped; the space is always included.
+    `csv_columns` selects the text columns of the CSV catalogs.
+    """
+    chars = {" "}
+    for path in paths:
+        options = {"columns": csv_columns} if os.path.splitext(path)[1].lower() == ".csv" else {}
+        for text in catalog_strings(path, **options):
+            if strip_placeholders:
+                text = PLACEHOLDER_PATTERN.sub("", text)
+            chars.update(char for char in text if char.isprintable())
+    return sorted(chars, key=ord)
+
+
+def font_coverage(ttf_path, chars, size=32):
+    """
+    Returns the characters of `chars` the font has no glyph for: those that render
+    exactly like its .notdef glyph, or render nothing at all (except the space).
+    """
+    font = ImageFont.truetype(ttf_path, size)
+
+    def render(char):
+        image = Image.new("L", (size * 2, size * 2), 0)
+        ImageDraw.Draw(image).text((size // 2, 0), char, font=font, fill=255)
+        return image.tobytes()
+
+    notdef = render(NOTDEF_PROBE)
+    blank = bytes(size * size * 4)
+    return [char for char in chars if char != " " and render(char) in (notdef, blank)]
+
+
+def charset_report(chars, missing, default_chars=DEFAULT_CHAR_LIST):
+    """Prints and returns how the extracted set compares to the default `char_list`."""
+    default = set(glyph_order(default_chars))
+    report = {
+        "glyphs": len(chars),
+        "default glyphs": len(default),
+        "added": sorted(set(chars) - default, key=ord),
+        "dropped": sorted(default - set(chars), key=ord),
+        "missing from font": list(missing),
+        "fits ROM bank": len(chars) <= BANK_SLOTS,
+    }
+    print(f"✅ Character set: {report['glyphs']} glyphs (default list: {report['default glyphs']})")
+    if report["added"]:
+        print(f"Added: {''.join(report['added'])!r}")
+    if report["dropped"]:
+        print(f"Not needed: {''.join(report['dropped'])!r}")
+    if missing:
+        print(f"⚠ Font has no glyph for: {' '.join(f'U+{ord(char):04X}' for char in missing)}")
+    if not report["fits ROM bank"]:
+        print(f"⚠ {len(chars)} glyphs do not fit a {BANK_SLOTS}-slot ROM bank")
+    return report
+
+
+def generate_catalog_xbm_data(generate_xbm_data, ttf_path, catalog_paths, forced_height, max_width,
+                              canvas_width, canvas_height, **generate_options):
+    """
+    Extracts the character set from `catalog_paths`, checks it against the font and
+    renders it with `generate_xbm_data` (any of the converter versions). Returns
+    (all_xbm_data, report); characters the generator skipped are reported too.
+    """
+    chars = extract_charset(catalog_paths)
+    missing = font_coverage(ttf_path, chars)
+    report = charset_report(chars, missing)
+    all_xbm_data = generate_xbm_data(ttf_path, [char for char in chars if char not in missing], forced_height,
+                                     max_width, canvas_width, canvas_height, **generate_options)
+    report["not rendered"] = [char for char in chars if char not in missing and char not in all_xbm_data]
+    if report["not rendered"]:
+        print(f"⚠ Not rendered: {''.join(report['not rendered'])!r}")
+    return all_xbm_data, report
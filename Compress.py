@@ -0,0 +1,139 @@
+"""
+Compressed glyph ROM format.
+
+The combined ROM stores raw bitmaps that are mostly zero rows. This format keeps
+the four banks of the combined assembler (16x32 Normal/Strikeout, 32x64
+Normal/Strikeout) but stores each glyph with zero-row skipping: a row mask followed
+by only the non-zero rows. An offset index per bank gives random access to glyphs.
+
+Image layout (little-endian):
+  u8 bank count
+  per bank: u8 row_bytes, u8 rows, u16 glyph_count, u32 index_offset
+  per bank index: glyph_count + 1 u32 record offsets (the last one ends the bank)
+  glyph records: rows // 8 mask bytes (bit r set = row r stored), then the stored rows
+  u16 byte-sum checksum of everything before it
+
+Rows keep the packed byte order, so for 32x64 bytes 0-1 are the High word and
+bytes 2-3 the Low word. `decompress_image` is the reference decoder.
+"""
+import time
+
+import numpy as np
+
+from Glyphs import pack_glyphs
+from Rom import (DEFAULT_SECTION_VARIANTS, TARGET_SIZE, assemble_combined_image, banks_from_combined_image,
+                 byte_sum_checksum, combined_banks)
+
+BANK_NAMES = list(DEFAULT_SECTION_VARIANTS)
+
+
+def compress_banks(banks):
+    """Encodes the bank arrays from `combined_banks` into a compressed image."""
+    header = bytearray([len(BANK_NAMES)])
+    header_size = 1 + 8 * len(BANK_NAMES)
+    index_size = sum(4 * (banks[name].shape[0] + 1) for name in BANK_NAMES)
+
+    indexes = bytearray()
+    records = bytearray()
+    position = header_size + index_size
+    for name in BANK_NAMES:
+        packed = banks[name]
+        glyph_count, rows, row_bytes = packed.shape
+        header += bytes([row_bytes, rows]) + glyph_count.to_bytes(2, "little")
+        header += (header_size + len(indexes)).to_bytes(4, "little")
+
+        stored = packed.any(axis=2)
+        masks = np.packbits(stored, axis=1, bitorder="little")
+        lengths = masks.shape[1] + stored.sum(axis=1) * row_bytes
+        offsets = position + np.concatenate([[0], np.cumsum(lengths)])
+        indexes += offsets.astype("<u4").tobytes()
+        for g in range(glyph_count):
+            records += masks[g].tobytes() + packed[g][stored[g]].tobytes()
+        position = int(offsets[-1])
+
+    image = header + indexes + records
+    image += byte_sum_checksum(image).to_bytes(2, "little")
+    return bytes(image)
+
+
+def decompress_glyph(image, bank_info, glyph):
+    """Reference decoder for a single glyph, returns its (rows, row_bytes) bitmap."""
+    row_bytes, rows, glyph_count, index_offset = bank_info
+    start, end = np.frombuffer(image, dtype="<u4", count=2, offset=index_offset + 4 * glyph)
+    mask_bytes = rows // 8
+    stored = np.unpackbits(np.frombuffer(image, dtype=np.uint8, count=mask_bytes, offset=start),
+                           bitorder="little").astype(bool)
+    bitmap = np.zeros((rows, row_bytes), dtype=np.uint8)
+    bitmap[stored] = np.frombuffer(image, dtype=np.uint8, count=end - start - mask_bytes,
+                                   offset=start + mask_bytes).reshape(-1, row_bytes)
+    return bitmap
+
+
+def read_bank_table(image):
+    """Returns {bank name: (row_bytes, rows, glyph_count, index_offset)}."""
+    table = {}
+    for i, name in enumerate(BANK_NAMES[:image[0]]):
+        entry = image[1 + 8 * i:9 + 8 * i]
+        table[name] = (entry[0], entry[1], int.from_bytes(entry[2:4], "little"), int.from_bytes(entry[4:8], "little"))
+    return table
+
+
+def decompress_image(image):
+    """Reference decoder: returns the bank arrays, ready for `assemble_combined_image`."""
+    if byte_sum_checksum(image[:-2]) != int.from_bytes(image[-2:], "little"):
+        raise ValueError("Compressed ROM checksum mismatch")
+    banks = {}
+    for name, bank_info in read_bank_table(image).items():
+        row_bytes, rows, glyph_count, _ = bank_info
+        packed = np.zeros((glyph_count, rows, row_bytes), dtype=np.uint8)
+        for g in range(glyph_count):
+            packed[g] = decompress_glyph(image, bank_info, g)
+        banks[name] = packed
+    return banks
+
+
+def write_compressed_binary(xbm_data_16x32, xbm_data_32x64, output_file, section_variants=None):
+    """Writes the compressed ROM for the two `generate_xbm_data` results."""
+    chars_16x32, packed_16x32 = pack_glyphs(xbm_data_16x32, 16, 32)
+    chars_32x64, packed_32x64 = pack_glyphs(xbm_data_32x64, 32, 64)
+    image = compress_banks(combined_banks(chars_16x32, packed_16x32, chars_32x64, packed_32x64, section_variants))
+
+    with open(output_file, "wb") as bin_file:
+        bin_file.write(image)
+    print(f"✅ Compressed binary written to {output_file} "
+          f"({len(image)} bytes, {len(image) / TARGET_SIZE:.1%} of the fixed-slot ROM)")
+    return image
+
+
+def benchmark_compression(combined_image, repeat=10):
+    """
+    Compresses a combined ROM image (e.g. FontRomCombined.bin), checks that the
+    decoder round-trips it byte-for-byte and reports compression ratio and decode
+    throughput.
+    """
+    banks = banks_from_combined_image(combined_image)
+    start = time.perf_counter()
+    compressed = compress_banks(banks)
+    encode_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        decoded = decompress_image(compressed)
+    decode_time = (time.perf_counter() - start) / repeat
+
+    glyph_count = sum(bank.shape[0] for bank in decoded.values())
+    report = {
+        "raw bytes": len(combined_image),
+        "compressed bytes": len(compressed),
+        "ratio": len(compressed) / len(combined_image),
+        "round trip ok": assemble_combined_image(decoded, len(combined_image)) == bytes(combined_image),
+        "encode seconds": encode_time,
+        "decode seconds": decode_time,
+        "decode glyphs/s": glyph_count / decode_time,
+        "decode MB/s": len(combined_image) / decode_time / 1e6,
+    }
+    print(f"Compressed {report['raw bytes']} -> {report['compressed bytes']} bytes (ratio {report['ratio']:.3f})")
+    print(f"Round trip: {'OK' if report['round trip ok'] else 'MISMATCH'}")
+    print(f"Encode: {encode_time * 1000:.2f} ms, decode: {decode_time * 1000:.2f} ms "
+          f"({report['decode glyphs/s']:.0f} glyphs/s, {report['decode MB/s']:.2f} MB/s)")
+    return report
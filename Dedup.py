@@ -0,0 +1,155 @@
+"""
+Deduplicated glyph ROM format.
+
+The fixed-slot ROM (see Rom.py) gives every character its own slot in every section,
+even when glyphs come out bit-identical (space is listed twice in `char_list`, and
+punctuation often collapses to the same pattern at 16x32). This format hashes the
+packed glyphs, stores each unique bitmap once and adds a character-to-slot table.
+
+Image layout (all offsets in bytes, sections start on a 2-byte boundary):
+  - header          at offset 0, see below
+  - 16x32 Index     one slot byte per glyph, in ROM slot order (the key order of
+                    `all_xbm_data`, i.e. `glyph_order(char_list)`)
+  - 32x64 Index     one slot byte per glyph, same order
+  - 16x32 Normal    unique slots, 32 big-endian words each
+  - 16x32 Strikeout unique slots, 32 words each
+  - 32x64 High      unique normal slots then unique strikeout slots, 64 words each
+  - 32x64 Low       same slot order as High
+  - checksum        little-endian byte sum of everything before it
+
+Header layout (little-endian), so firmware can find every section in the binary:
+  "DDUP", u16 header length,
+  u16 16x32 glyph count, u16 16x32 unique count,
+  u16 32x64 glyph count, u16 32x64 unique count,
+  u32 offset per section, in the order above (16x32 Index .. 32x64 Low)
+"""
+import struct
+
+import numpy as np
+
+from Glyphs import pack_glyphs, section_words
+from Rom import TARGET_SIZE, byte_sum_checksum
+from Variants import strikeout
+
+DEDUP_MAGIC = b"DDUP"
+SECTION_NAMES = ("16x32 Index", "32x64 Index", "16x32 Normal", "16x32 Strikeout", "32x64 High", "32x64 Low")
+DEDUP_HEADER = struct.Struct("<4sHHHHH" + "I" * len(SECTION_NAMES))
+
+
+def dedupe_glyphs(*variants):
+    """
+    Assigns one slot per distinct glyph.
+
+    `variants` are packed arrays with the same glyph count (e.g. normal and strikeout);
+    a glyph only shares a slot when every variant is bit-identical. Returns
+    (unique_indices, slot_index) where `unique_indices` are the first glyph of each
+    slot and `slot_index[i]` is the slot glyph i maps to.
+    """
+    slots = {}
+    unique_indices = []
+    slot_index = np.zeros(variants[0].shape[0], dtype=np.uint8)
+    for i in range(variants[0].shape[0]):
+        key = b"".join(variant[i].tobytes() for variant in variants)
+        slot = slots.get(key)
+        if slot is None:
+            slot = slots[key] = len(unique_indices)
+            unique_indices.append(i)
+        slot_index[i] = slot
+    if len(unique_indices) > 256:
+        raise ValueError(f"Too many unique glyphs for an 8-bit slot index: {len(unique_indices)}")
+    return np.asarray(unique_indices, dtype=np.intp), slot_index
+
+
+def build_dedup_image(chars_16x32, packed_16x32, chars_32x64, packed_32x64):
+    """
+    Builds the deduplicated ROM image.
+
+    Returns (image, offsets, report): `offsets` maps section names to byte offsets and
+    `report` holds the glyph counts and the bytes saved against the fixed-slot layout.
+    """
+    strike_16x32 = strikeout(chars_16x32, packed_16x32, 16, 32)
+    strike_32x64 = strikeout(chars_32x64, packed_32x64, 32, 64)
+    unique_16x32, index_16x32 = dedupe_glyphs(packed_16x32, strike_16x32)
+    unique_32x64, index_32x64 = dedupe_glyphs(packed_32x64, strike_32x64)
+
+    words_16x32 = section_words(packed_16x32[unique_16x32])
+    strike_words_16x32 = section_words(strike_16x32[unique_16x32])
+    words_32x64 = np.concatenate([section_words(packed_32x64[unique_32x64]),
+                                  section_words(strike_32x64[unique_32x64])])
+
+    sections = [
+        ("16x32 Index", index_16x32.tobytes()),
+        ("32x64 Index", index_32x64.tobytes()),
+        ("16x32 Normal", words_16x32[..., 0].astype(">u2").tobytes()),
+        ("16x32 Strikeout", strike_words_16x32[..., 0].astype(">u2").tobytes()),
+        ("32x64 High", words_32x64[..., 0].astype(">u2").tobytes()),
+        ("32x64 Low", words_32x64[..., 1].astype(">u2").tobytes()),
+    ]
+
+    image = bytearray(DEDUP_HEADER.size)
+    offsets = {}
+    for name, data in sections:
+        if len(image) % 2:
+            image.append(0x00)
+        offsets[name] = len(image)
+        image += data
+    if len(image) % 2:
+        image.append(0x00)
+    image[:DEDUP_HEADER.size] = DEDUP_HEADER.pack(
+        DEDUP_MAGIC, DEDUP_HEADER.size, len(chars_16x32), len(unique_16x32), len(chars_32x64), len(unique_32x64),
+        *(offsets[name] for name in SECTION_NAMES))
+    checksum = byte_sum_checksum(image)
+    image += checksum.to_bytes(2, "little")
+
+    fixed_glyph_bytes = 2 * (packed_16x32[0].size * len(chars_16x32) + packed_32x64[0].size * len(chars_32x64))
+    dedup_glyph_bytes = 2 * (packed_16x32[0].size * len(unique_16x32) + packed_32x64[0].size * len(unique_32x64))
+    report = {
+        "16x32 glyphs": len(chars_16x32),
+        "16x32 unique": len(unique_16x32),
+        "32x64 glyphs": len(chars_32x64),
+        "32x64 unique": len(unique_32x64),
+        "glyph bytes saved": fixed_glyph_bytes - dedup_glyph_bytes,
+        "index bytes": len(index_16x32) + len(index_32x64),
+        "image bytes": len(image),
+        "image bytes saved": TARGET_SIZE - len(image),
+    }
+    return bytes(image), offsets, report
+
+
+def read_dedup_header(image):
+    """
+    Parses the header of a deduplicated image. Returns {"counts": {...}, "offsets":
+    {section name: byte offset}}; raises ValueError when the magic does not match.
+    """
+    magic, length, glyphs_16x32, unique_16x32, glyphs_32x64, unique_32x64, *offsets = \
+        DEDUP_HEADER.unpack_from(image, 0)
+    if magic != DEDUP_MAGIC or length != DEDUP_HEADER.size:
+        raise ValueError("Not a deduplicated ROM image (bad header)")
+    return {
+        "counts": {"16x32 glyphs": glyphs_16x32, "16x32 unique": unique_16x32,
+                   "32x64 glyphs": glyphs_32x64, "32x64 unique": unique_32x64},
+        "offsets": dict(zip(SECTION_NAMES, offsets)),
+    }
+
+
+def write_dedup_binary(xbm_data_16x32, xbm_data_32x64, output_file):
+    """
+    Writes the deduplicated ROM for the two `generate_xbm_data` results and prints
+    the section layout and savings. The fixed-slot FontRomCombined.bin is unaffected.
+    """
+    chars_16x32, packed_16x32 = pack_glyphs(xbm_data_16x32, 16, 32)
+    chars_32x64, packed_32x64 = pack_glyphs(xbm_data_32x64, 32, 64)
+    image, offsets, report = build_dedup_image(chars_16x32, packed_16x32, chars_32x64, packed_32x64)
+
+    with open(output_file, "wb") as bin_file:
+        bin_file.write(image)
+
+    print(f"{'Header':<16} at 0x00000 ({DEDUP_HEADER.size} bytes)")
+    for name, offset in offsets.items():
+        print(f"{name:<16} at 0x{offset:05X}")
+    print(f"16x32: {report['16x32 unique']} unique of {report['16x32 glyphs']} glyphs")
+    print(f"32x64: {report['32x64 unique']} unique of {report['32x64 glyphs']} glyphs")
+    print(f"Glyph bytes saved by deduplication: {report['glyph bytes saved']}")
+    print(f"✅ Deduplicated binary written to {output_file} "
+          f"({report['image bytes']} bytes, {report['image bytes saved']} smaller than the fixed-slot ROM)")
+    return offsets, report
@@ -0,0 +1,118 @@
+"""
+Delta update packages between two combined ROM images.
+
+Small font tweaks only change a few glyph rows, but updating a device meant sending
+the whole 80 KB image. A delta package lists just the changed 16-bit word ranges,
+plus the CRC-32 the device image must have before and after patching.
+
+Package layout (little-endian):
+  u32 image size, u32 CRC-32 before, u32 CRC-32 after, u16 range count
+  per range: u32 byte offset, u16 word count, then the new words (2 bytes each)
+
+`apply_patch` is the reference applier.
+"""
+import struct
+import time
+import zlib
+
+import numpy as np
+
+PATCH_HEADER = struct.Struct("<IIIH")
+RANGE_HEADER = struct.Struct("<IH")
+
+# Merging two ranges costs the gap words, a separate range costs its header
+MERGE_GAP_WORDS = RANGE_HEADER.size // 2
+MAX_RANGE_WORDS = 0xFFFF
+
+
+def changed_word_ranges(old_image, new_image, merge_gap=MERGE_GAP_WORDS):
+    """Returns [(first word, end word)] ranges where the two images differ."""
+    old_words = np.frombuffer(old_image, dtype=np.uint16)
+    new_words = np.frombuffer(new_image, dtype=np.uint16)
+    changed = np.flatnonzero(old_words != new_words)
+    if changed.size == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(changed) > merge_gap + 1)
+    starts = np.concatenate([[changed[0]], changed[breaks + 1]])
+    ends = np.concatenate([changed[breaks], [changed[-1]]]) + 1
+
+    ranges = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        for chunk_start in range(start, end, MAX_RANGE_WORDS):
+            ranges.append((chunk_start, min(chunk_start + MAX_RANGE_WORDS, end)))
+    return ranges
+
+
+def build_patch(old_image, new_image, merge_gap=MERGE_GAP_WORDS):
+    """Builds a delta package that turns `old_image` into `new_image`."""
+    if len(old_image) != len(new_image) or len(old_image) % 2:
+        raise ValueError("Both ROM images must have the same, even size")
+    ranges = changed_word_ranges(old_image, new_image, merge_gap)
+    patch = bytearray(PATCH_HEADER.pack(len(old_image), zlib.crc32(old_image), zlib.crc32(new_image), len(ranges)))
+    for start, end in ranges:
+        patch += RANGE_HEADER.pack(start * 2, end - start)
+        patch += new_image[start * 2:end * 2]
+    return bytes(patch)
+
+
+def apply_patch(old_image, patch):
+    """Reference applier: checks the CRC-32 before and after and returns the new image."""
+    size, crc_before, crc_after, range_count = PATCH_HEADER.unpack_from(patch)
+    if len(old_image) != size or zlib.crc32(old_image) != crc_before:
+        raise ValueError("ROM image does not match the patch's pre-patch checksum")
+    image = bytearray(old_image)
+    position = PATCH_HEADER.size
+    for _ in range(range_count):
+        offset, word_count = RANGE_HEADER.unpack_from(patch, position)
+        position += RANGE_HEADER.size
+        image[offset:offset + word_count * 2] = patch[position:position + word_count * 2]
+        position += word_count * 2
+    if zlib.crc32(image) != crc_after:
+        raise ValueError("Patched ROM image does not match the patch's post-patch checksum")
+    return bytes(image)
+
+
+def delta_report(old_image, new_image, patch, build_seconds, apply_seconds, baudrates=(9600, 115200)):
+    """Prints and returns patch size and the UART transfer time against a full image."""
+    report = {
+        "image bytes": len(new_image),
+        "patch bytes": len(patch),
+        "ranges": PATCH_HEADER.unpack_from(patch)[3],
+        "ratio": len(patch) / len(new_image),
+        "build seconds": build_seconds,
+        "apply seconds": apply_seconds,
+    }
+    print(f"Delta patch: {report['patch bytes']} bytes in {report['ranges']} ranges "
+          f"({report['ratio']:.2%} of the {report['image bytes']}-byte image)")
+    print(f"Build {build_seconds * 1000:.2f} ms, apply {apply_seconds * 1000:.2f} ms")
+    for baudrate in baudrates:
+        # 8N1: 10 bits on the wire per byte
+        full_seconds = len(new_image) * 10 / baudrate
+        patch_seconds = len(patch) * 10 / baudrate
+        report[f"full upload s @{baudrate}"] = full_seconds
+        report[f"patch upload s @{baudrate}"] = patch_seconds
+        print(f"  {baudrate:>6} baud: full image {full_seconds:7.2f} s, patch {patch_seconds:7.2f} s")
+    return report
+
+
+def write_delta_package(old_file, new_file, patch_file):
+    """Builds a delta package between two ROM files, verifies it and reports its size."""
+    with open(old_file, "rb") as f:
+        old_image = f.read()
+    with open(new_file, "rb") as f:
+        new_image = f.read()
+
+    start = time.perf_counter()
+    patch = build_patch(old_image, new_image)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    patched = apply_patch(old_image, patch)
+    apply_seconds = time.perf_counter() - start
+    if patched != new_image:
+        raise ValueError("Delta package does not reproduce the new ROM image")
+
+    with open(patch_file, "wb") as f:
+        f.write(patch)
+    print(f"✅ Delta package saved as {patch_file}")
+    return delta_report(old_image, new_image, patch, build_seconds, apply_seconds)
@@ -0,0 +1,145 @@
+"""
+Direct-size glyph rendering.
+
+`generate_xbm_data` rasterizes every glyph at font_size = forced_height * 2, then
+allocates a second image, downsamples it to (scaled_width, target_height) with
+LANCZOS and thresholds it: about four times the pixels plus an expensive filter
+per glyph. `generate_xbm_data_direct` takes the same arguments and returns the
+same {char: [[row bytes], ...]}, but sizes the font per glyph so the outline
+rasterizes at the final pixel height:
+
+  - the target box comes from the same metrics as `generate_xbm_data` (the ink box
+    at forced_height * 2, punctuation and narrow-character scaling), and glyphs are
+    placed with the same canvas rules (`place_glyph`)
+  - mode "mono" uses FreeType's hinted monochrome output, "gray" its antialiased
+    output thresholded at `threshold_value`
+  - only when the rendered box misses the target (rounding, or the horizontal
+    squeeze of max_width and the narrow "I") is the final-size image resized
+
+`compare_render_modes` reports the speed of both paths and how well their ink
+agrees: the intersection over union of the inked pixels (background pixels, most
+of every canvas, would make whole-canvas agreement look better than it is) and
+the number of identical glyphs.
+"""
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from Glyphs import canvas_rows, pack_glyphs, place_glyph
+
+RENDER_MODES = {"mono": ("1", Image.Resampling.NEAREST), "gray": ("L", Image.Resampling.BOX)}
+
+PUNCTUATION_SET = {",", "."}
+PUNCTUATION_SCALE = 0.25
+NARROW_CHARS = {"I"}
+NARROW_CHAR_SCALE = 0.5
+
+
+def target_box(char, width, height, forced_height, max_width):
+    """(scaled_width, target_height) `generate_xbm_data` resizes a width x height ink box to."""
+    aspect_ratio = width / height
+    if char in PUNCTUATION_SET:
+        target_height = int(forced_height * PUNCTUATION_SCALE)
+        scaled_width = min(int(target_height * aspect_ratio), max_width)
+    elif char in NARROW_CHARS:
+        target_height = forced_height
+        scaled_width = min(int(target_height * aspect_ratio * NARROW_CHAR_SCALE), max_width)
+    else:
+        target_height = forced_height
+        scaled_width = min(int(target_height * aspect_ratio), max_width)
+    return scaled_width, target_height
+
+
+def generate_xbm_data_direct(ttf_path, char_list, forced_height, max_width, canvas_width, canvas_height,
+                             threshold_value=128, padding_top=0, padding_bottom=0, mode="mono"):
+    """
+    Drop-in alternative to `generate_xbm_data` that rasterizes every glyph at its
+    final pixel height (see the module docstring). `mode` is "mono" or "gray".
+    """
+    if mode not in RENDER_MODES:
+        raise ValueError(f"Unknown render mode '{mode}' (expected {', '.join(RENDER_MODES)})")
+    font_mode, resample = RENDER_MODES[mode]
+    fonts = {}
+
+    def font_at(size):
+        if size not in fonts:
+            fonts[size] = ImageFont.truetype(ttf_path, size)
+        return fonts[size]
+
+    reference = font_at(forced_height * 2)
+    blank = [[0x00] * (canvas_width // 8) for _ in range(canvas_height)]
+    all_xbm_data = {}
+    for char in char_list:
+        try:
+            if char == " ":
+                all_xbm_data[char] = [row[:] for row in blank]
+                continue
+
+            (width, height), _ = reference.font.getsize(char)
+            if width == 0 or height == 0:
+                continue
+            scaled_width, target_height = target_box(char, width, height, forced_height, max_width)
+
+            # Scale the font so the ink box comes out target_height pixels tall
+            font = font_at(max(1, round(forced_height * 2 * target_height / height)))
+            left, top, right, bottom = font.getbbox(char, mode=font_mode)
+            image = Image.new("L", (max(right - left, 1), max(bottom - top, 1)), 0)
+            draw = ImageDraw.Draw(image)
+            draw.fontmode = font_mode
+            draw.text((-left, -top), char, font=font, fill=255)
+            if image.size != (scaled_width, target_height):
+                image = image.resize((scaled_width, target_height), resample)
+
+            bitmap = np.asarray(image) > threshold_value
+            all_xbm_data[char] = canvas_rows(place_glyph(bitmap, canvas_width, canvas_height, padding_top)).tolist()
+
+        except Exception as e:
+            print(f"Warning: Unable to process character '{char}'. Reason: {e}")
+
+    return all_xbm_data
+
+
+def compare_render_modes(generate_xbm_data, ttf_path, char_list, forced_height, max_width, canvas_width,
+                         canvas_height, modes=tuple(RENDER_MODES), worst=5, **options):
+    """
+    Renders `char_list` with `generate_xbm_data` and with every direct mode, and
+    reports the speed of each and its ink agreement with the current path: ink
+    intersection over union, identical glyphs and the `worst` glyphs by differing
+    pixels. Returns {mode: report}.
+    """
+    start = time.perf_counter()
+    reference = generate_xbm_data(ttf_path, char_list, forced_height, max_width, canvas_width, canvas_height,
+                                  **options)
+    reference_seconds = time.perf_counter() - start
+    chars, packed = pack_glyphs(reference, canvas_width, canvas_height)
+    reference_pixels = np.unpackbits(packed, axis=2, bitorder="little")
+    print(f"Current path: {len(chars)} glyphs in {reference_seconds * 1000:.1f} ms")
+
+    reports = {}
+    for mode in modes:
+        start = time.perf_counter()
+        direct = generate_xbm_data_direct(ttf_path, char_list, forced_height, max_width, canvas_width, canvas_height,
+                                          mode=mode, **options)
+        seconds = time.perf_counter() - start
+
+        blank = np.zeros((canvas_height, canvas_width // 8), dtype=np.uint8)
+        direct_packed = np.stack([np.asarray(direct.get(char, blank), dtype=np.uint8) for char in chars])
+        direct_pixels = np.unpackbits(direct_packed, axis=2, bitorder="little")
+        differing = (direct_pixels != reference_pixels).sum(axis=(1, 2))
+        union = np.count_nonzero(direct_pixels | reference_pixels)
+        ink_iou = np.count_nonzero(direct_pixels & reference_pixels) / union if union else 1.0
+        order = np.argsort(-differing, kind="stable")[:worst]
+        reports[mode] = {
+            "seconds": seconds,
+            "speedup": reference_seconds / seconds,
+            "ink_iou": ink_iou,
+            "identical_glyphs": int((differing == 0).sum()),
+            "missing": [char for char in chars if char not in direct],
+            "worst": [(chars[i], int(differing[i])) for i in order if differing[i]],
+        }
+        print(f"✅ {mode:<4}: {seconds * 1000:7.1f} ms ({reference_seconds / seconds:.1f}x faster), "
+              f"ink IoU {ink_iou:.3f}, {reports[mode]['identical_glyphs']}/{len(chars)} glyphs identical")
+        if reports[mode]["worst"]:
+            print("  most different: " + ", ".join(f"'{char}' {count} px" for char, count in reports[mode]["worst"]))
+    return reports
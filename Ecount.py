@@ -0,0 +1,325 @@
+"""
+Host-side client for the ecount monitor-control protocol, plus a pseudo-terminal
+device emulator for offline latency and throughput measurements.
+
+Framing follows `ecount_get_version` in Btw.c:
+  request:  ECOUNT_HEADER, node, command, length, data..., checksum(node..data)
+  response: 0xBB,          node, command, length, data..., checksum(node..data)
+The firmware sends Get_Firmware_Version (0x12) with no data and expects a 15-byte
+answer whose byte 13 holds the current input type.
+
+ECOUNT_HEADER, `checksum()` and the Set_Adjuster command used by
+`handle_button_press` (Input.c) live in firmware headers that are not part of this
+tree; the values below (0xAA, an 8-bit sum, command 0x11 with adjuster/value data
+bytes) are the defaults used by the emulator and can be changed in one place if the
+real board differs.
+
+Unlike the firmware, which sleeps a fixed HAL_Delay(30) and then scans its ring
+buffer, the client waits on the port with select() and returns as soon as a
+complete, checksummed frame has arrived.
+"""
+import os
+import select
+import statistics
+import termios
+import threading
+import time
+import tty
+
+ECOUNT_HEADER = 0xAA
+RESPONSE_HEADER = 0xBB
+ECOUNT_NODE = 0x01
+
+CMD_SET_ADJUSTER = 0x11
+CMD_GET_FIRMWARE_VERSION = 0x12
+
+ADJ_INPUT_SELECT = 0x01
+
+# Input.c
+HDMI_INPUT = 27
+DP_INPUT = 30
+INPUT_NOT_SWITCHED = 0x80
+
+# 15-byte version answer: 4 header bytes, 10 data bytes, checksum
+VERSION_DATA_LENGTH = 10
+INPUT_TYPE_INDEX = 13
+
+DEFAULT_TIMEOUT = 0.2
+
+
+def checksum(data):
+    """8-bit sum of the node, command, length and data bytes."""
+    return sum(data) & 0xFF
+
+
+def build_packet(node, command, data=b"", header=ECOUNT_HEADER):
+    """Builds a frame: header, node, command, length, data, checksum."""
+    body = bytes([node, command, len(data)]) + bytes(data)
+    return bytes([header]) + body + bytes([checksum(body)])
+
+
+def build_response(node, command, data=b""):
+    """Builds a device answer frame (0xBB start byte)."""
+    return build_packet(node, command, data, header=RESPONSE_HEADER)
+
+
+class FrameParser:
+    """
+    Incremental frame parser. Bytes are fed in as they arrive; complete frames with
+    a valid checksum come out as (node, command, data) tuples. Anything before a
+    start byte is skipped, and a frame with a bad checksum resyncs on the next one.
+    """
+
+    def __init__(self, header=RESPONSE_HEADER):
+        self.header = header
+        self.buffer = bytearray()
+        self.resyncs = 0
+
+    def feed(self, data):
+        self.buffer += data
+        frames = []
+        while True:
+            start = self.buffer.find(self.header)
+            if start < 0:
+                self.resyncs += bool(self.buffer)
+                self.buffer.clear()
+                return frames
+            if start:
+                self.resyncs += 1
+                del self.buffer[:start]
+            if len(self.buffer) < 4:
+                return frames
+            end = 4 + self.buffer[3] + 1
+            if len(self.buffer) < end:
+                return frames
+            frame = bytes(self.buffer[:end])
+            if checksum(frame[1:-1]) != frame[-1]:
+                # Not a real frame start, look for the next header byte
+                self.resyncs += 1
+                del self.buffer[:1]
+                continue
+            del self.buffer[:end]
+            frames.append((frame[1], frame[2], frame[4:-1]))
+
+
+def open_serial(path, baudrate=115200):
+    """Opens a serial device (or pty) in raw, non-blocking mode and returns its fd."""
+    fd = os.open(path, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+    tty.setraw(fd)
+    attrs = termios.tcgetattr(fd)
+    speed = getattr(termios, f"B{baudrate}")
+    attrs[4] = attrs[5] = speed
+    termios.tcsetattr(fd, termios.TCSANOW, attrs)
+    return fd
+
+
+def write_all(fd, data):
+    """Writes all of `data` to a non-blocking fd."""
+    view = memoryview(data)
+    while view:
+        select.select([], [fd], [])
+        try:
+            written = os.write(fd, view)
+        except BlockingIOError:
+            continue
+        view = view[written:]
+
+
+class EcountClient:
+    """Speaks the ecount protocol to one node over an open serial fd."""
+
+    def __init__(self, fd, node=ECOUNT_NODE, timeout=DEFAULT_TIMEOUT):
+        self.fd = fd
+        self.node = node
+        self.timeout = timeout
+        self.parser = FrameParser()
+        self.frames = []
+        self.stray_frames = 0
+
+    @classmethod
+    def open(cls, path, baudrate=115200, **kwargs):
+        return cls(open_serial(path, baudrate), **kwargs)
+
+    def close(self):
+        os.close(self.fd)
+
+    def send(self, command, data=b""):
+        write_all(self.fd, build_packet(self.node, command, data))
+
+    def read_frame(self, timeout=None, deadline=None):
+        """
+        Waits for the next complete frame until `timeout` has passed (or until the
+        monotonic `deadline`); raises TimeoutError when none arrives in time.
+        """
+        if deadline is None:
+            deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        while not self.frames:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([self.fd], [], [], remaining)[0]:
+                raise TimeoutError(f"No ecount response from node 0x{self.node:02X}")
+            try:
+                chunk = os.read(self.fd, 4096)
+            except BlockingIOError:
+                continue
+            self.frames += self.parser.feed(chunk)
+        return self.frames.pop(0)
+
+    def read_response(self, command, timeout=None):
+        """
+        Reads frames until the answer to `command` from this node shows up. The
+        timeout covers the whole wait, so unrelated frames cannot extend it.
+        """
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        while True:
+            node, answer_command, data = self.read_frame(deadline=deadline)
+            if node == self.node and answer_command == command:
+                return data
+            self.stray_frames += 1
+
+    def request(self, command, data=b"", timeout=None):
+        self.send(command, data)
+        return self.read_response(command, timeout)
+
+    def request_pipelined(self, requests, window=8, timeout=None):
+        """
+        Sends (command, data) requests keeping up to `window` of them in flight.
+        The device answers in order, so responses are matched first-in first-out.
+        """
+        responses = []
+        pending = []
+        for command, data in requests:
+            if len(pending) >= window:
+                responses.append(self.read_response(pending.pop(0), timeout))
+            self.send(command, data)
+            pending.append(command)
+        for command in pending:
+            responses.append(self.read_response(command, timeout))
+        return responses
+
+    def get_version(self, timeout=None):
+        """Returns the input type byte (byte 13 of the version answer)."""
+        data = self.request(CMD_GET_FIRMWARE_VERSION, timeout=timeout)
+        return data[INPUT_TYPE_INDEX - 4]
+
+    def set_adjuster(self, adjuster, value, timeout=None):
+        return self.request(CMD_SET_ADJUSTER, bytes([adjuster, value]), timeout=timeout)
+
+
+class EcountEmulator:
+    """
+    Pseudo-terminal stand-in for an ecount node. Connect a client to `port_name`.
+    `handlers` maps commands to functions returning the answer data; `latency`
+    delays every answer and `noise` is sent before each answer to exercise resync.
+
+    Selecting a new input reports INPUT_NOT_SWITCHED until `switch_delay` has passed,
+    then the node sends an unsolicited version frame with the new input type.
+    """
+
+    def __init__(self, node=ECOUNT_NODE, input_type=HDMI_INPUT, latency=0.0, noise=b"", switch_delay=0.02):
+        self.node = node
+        self.input_type = input_type
+        self.latency = latency
+        self.noise = noise
+        self.switch_delay = switch_delay
+        self.requests = 0
+        self.handlers = {
+            CMD_GET_FIRMWARE_VERSION: self.version_data,
+            CMD_SET_ADJUSTER: self.set_adjuster,
+        }
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        self.port_name = os.ttyname(self.slave)
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def version_data(self, data):
+        return bytes([0x01, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, self.input_type])
+
+    def set_adjuster(self, data):
+        adjuster, value = data[0], data[1]
+        if adjuster == ADJ_INPUT_SELECT:
+            self.input_type = INPUT_NOT_SWITCHED
+            timer = threading.Timer(self.switch_delay, self._finish_switch, (value,))
+            timer.daemon = True
+            timer.start()
+        return bytes([adjuster, value])
+
+    def _finish_switch(self, value):
+        self.input_type = value
+        self._send(build_response(self.node, CMD_GET_FIRMWARE_VERSION, self.version_data(b"")))
+
+    def _send(self, frame):
+        with self._write_lock:
+            if not self._stop.is_set():
+                write_all(self.master, self.noise + frame)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        with self._write_lock:
+            os.close(self.master)
+            os.close(self.slave)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _run(self):
+        parser = FrameParser(header=ECOUNT_HEADER)
+        while not self._stop.is_set():
+            if not select.select([self.master], [], [], 0.05)[0]:
+                continue
+            try:
+                chunk = os.read(self.master, 4096)
+            except OSError:
+                return
+            for node, command, data in parser.feed(chunk):
+                handler = self.handlers.get(command)
+                if node != self.node or handler is None:
+                    continue
+                self.requests += 1
+                if self.latency:
+                    time.sleep(self.latency)
+                self._send(build_response(self.node, command, handler(data)))
+
+
+def benchmark_client(count=500, window=8, latency=0.0005):
+    """
+    Measures get-version latency and throughput against the pty emulator, one
+    request at a time and pipelined with `window` requests in flight.
+    """
+    with EcountEmulator(latency=latency, noise=b"\x00\x55") as emulator:
+        client = EcountClient.open(emulator.port_name)
+        try:
+            latencies = []
+            start = time.perf_counter()
+            for _ in range(count):
+                sent = time.perf_counter()
+                client.get_version()
+                latencies.append(time.perf_counter() - sent)
+            sequential = time.perf_counter() - start
+
+            start = time.perf_counter()
+            client.request_pipelined([(CMD_GET_FIRMWARE_VERSION, b"")] * count, window=window)
+            pipelined = time.perf_counter() - start
+        finally:
+            client.close()
+
+    report = {
+        "mean latency ms": statistics.mean(latencies) * 1000,
+        "p95 latency ms": sorted(latencies)[int(len(latencies) * 0.95)] * 1000,
+        "sequential req/s": count / sequential,
+        "pipelined req/s": count / pipelined,
+        "resyncs": client.parser.resyncs,
+    }
+    print(f"Latency: mean {report['mean latency ms']:.3f} ms, p95 {report['p95 latency ms']:.3f} ms")
+    print(f"Throughput: {report['sequential req/s']:.0f} req/s sequential, "
+          f"{report['pipelined req/s']:.0f} req/s pipelined (window {window})")
+    return report
@@ -0,0 +1,207 @@
+"""
+Fan-out emitter for memory initialization files.
+
+Besides Quartus MIF, Verilog simulations load `$readmemh` .mem files and the Xilinx
+flow needs .coe files. Instead of post-processing the MIF text, this emitter walks
+the packed glyphs once and writes any selection of formats for every memory
+`write_mif` produces (the 32x64 or 16x32 file, and the 32x64 Low and High halves),
+with the same normal/strikeout address mapping. Rows and addresses are formatted
+to hex once per section (see MifWriter) and shared by all text formats.
+
+  - mif  byte-identical to `write_mif` (optionally range-compressed)
+  - mem  `$readmemh`: `@address` where a section starts, one word per line,
+         `//` character comments
+  - coe  `memory_initialization_vector`, dense from address 0, gaps zero-filled
+  - bin  raw big-endian words from address 0, gaps zero-filled, padded to DEPTH
+
+For 16x32, `write_mif` puts the strikeout copies at 0x2000 and up, past DEPTH =
+8192. MIF keeps that layout as is. The mem, coe and bin files hold every entry up
+to the last one (10720 words), and a warning names the memory depth they need,
+since a memory sized to DEPTH cannot load them.
+"""
+import os
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from Glyphs import pack_glyphs
+from MifWriter import (WRITE_BUFFER_SIZE, format_entries, hex_matrix, mif_sections, mif_targets, native_newlines,
+                       repeat_text, row_hex)
+
+FORMATS = ("mif", "mem", "coe", "bin")
+
+
+class MemoryOutput(ABC):
+    """One memory in one format. Subclasses return the bytes to write for each step."""
+
+    extension = None
+
+    def __init__(self, target):
+        self.target = target
+        self.path = os.path.splitext(target["path"])[0] + self.extension
+        self.word_bytes = target["width"] // 8
+        self.address = 0
+        self.rows = 0
+
+    def begin(self):
+        return b""
+
+    def move_to(self, address):
+        """Called when a section starts at `address`."""
+        self.address = address
+        return b""
+
+    @abstractmethod
+    def prepare(self, address_hex, value_hex, raw, rows):
+        """Formats a whole section; returns (bytes, per-glyph offsets)."""
+
+    def glyph(self, label, char, data):
+        self.address += self.rows
+        return data
+
+    def end(self):
+        return b""
+
+
+class MemOutput(MemoryOutput):
+    extension = ".mem"
+
+    def move_to(self, address):
+        self.address = address
+        return f"@{address:04X}\n".encode("ascii")
+
+    def prepare(self, address_hex, value_hex, raw, rows):
+        self.rows = rows
+        lines = np.concatenate([value_hex, repeat_text(b"\n", value_hex.shape[0])], axis=1)
+        return lines.tobytes(), np.arange(0, value_hex.shape[0] + 1, rows) * lines.shape[1]
+
+    def glyph(self, label, char, data):
+        self.address += self.rows
+        return f"// {label}: '{char}'\n".encode("utf-8") + data
+
+
+class CoeOutput(MemoryOutput):
+    extension = ".coe"
+
+    def begin(self):
+        return b"memory_initialization_radix=16;\nmemory_initialization_vector=\n"
+
+    def move_to(self, address):
+        # Zero words up to the section start, each followed by its separator
+        fill = ("0" * (self.word_bytes * 2) + ",\n") * (address - self.address)
+        self.address = address
+        return fill.encode("ascii")
+
+    def prepare(self, address_hex, value_hex, raw, rows):
+        self.rows = rows
+        lines = np.concatenate([value_hex, repeat_text(b",\n", value_hex.shape[0])], axis=1)
+        return lines.tobytes(), np.arange(0, value_hex.shape[0] + 1, rows) * lines.shape[1]
+
+    def end(self):
+        # The vector ends with ';' instead of the last ','
+        return b";\n"
+
+
+class BinOutput(MemoryOutput):
+    extension = ".bin"
+
+    def move_to(self, address):
+        fill = bytes((address - self.address) * self.word_bytes)
+        self.address = address
+        return fill
+
+    def prepare(self, address_hex, value_hex, raw, rows):
+        self.rows = rows
+        return raw.tobytes(), np.arange(0, raw.shape[0] + 1, rows) * raw.shape[1]
+
+    def end(self):
+        return bytes(max(self.target["depth"] - self.address, 0) * self.word_bytes)
+
+
+class MifOutput(MemoryOutput):
+    extension = ".mif"
+
+    def __init__(self, target, compress_ranges=False):
+        super().__init__(target)
+        self.compress_ranges = compress_ranges
+
+    # Line endings follow `write_mif`'s text-mode writes (see MifWriter)
+    def begin(self):
+        return native_newlines((f"DEPTH = {self.target['depth']};\nWIDTH = {self.target['width']};\n"
+                                f"ADDRESS_RADIX = HEX;\nDATA_RADIX = HEX;\nCONTENT BEGIN\n\n").encode("ascii"))
+
+    def prepare(self, address_hex, value_hex, raw, rows):
+        self.rows = rows
+        return format_entries(address_hex, value_hex, rows, self.compress_ranges)
+
+    def glyph(self, label, char, data):
+        self.address += self.rows
+        return native_newlines(f"-- {label}: '{char}'\n".encode("utf-8") + data)
+
+    def end(self):
+        return native_newlines(self.target["end"])
+
+
+OUTPUT_TYPES = {"mif": MifOutput, "mem": MemOutput, "coe": CoeOutput, "bin": BinOutput}
+
+
+def emit_memories(all_xbm_data, output_file, canvas_width, canvas_height, formats=FORMATS, compress_ranges=False):
+    """
+    Writes every memory of `write_mif`'s output set (named after `output_file`, e.g.
+    FontRom64.mif -> FontRom64.mem, FontRom16x64_Low.coe, ...) in each of `formats`,
+    in a single traversal of the glyphs. Returns the written paths.
+    """
+    unknown = [name for name in formats if name not in OUTPUT_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown output format(s) {', '.join(unknown)} (expected {', '.join(OUTPUT_TYPES)})")
+    chars, packed = pack_glyphs(all_xbm_data, canvas_width, canvas_height)
+    # Empty sections write nothing, not even the zero fill up to their start
+    sections = [section for section in mif_sections(chars, packed, canvas_width, canvas_height) if len(section[2])]
+    extent = max((base_address + glyphs.shape[0] * glyphs.shape[1] for _, base_address, glyphs in sections),
+                 default=0)
+    outputs = []
+    for target in mif_targets(output_file, canvas_width, canvas_height):
+        for name in dict.fromkeys(formats):
+            output = MifOutput(target, compress_ranges) if name == "mif" else OUTPUT_TYPES[name](target)
+            outputs.append(output)
+            if name != "mif" and extent > target["depth"]:
+                print(f"⚠ {os.path.basename(output.path)} holds {extent} words, past DEPTH = {target['depth']}: "
+                      f"load it into a memory at least {extent} words deep")
+
+    # For the COE separator to end up right, its last ',' is rewritten after the traversal
+    files = [open(output.path, "w+b" if isinstance(output, CoeOutput) else "wb", buffering=WRITE_BUFFER_SIZE)
+             for output in outputs]
+    try:
+        for output, f in zip(outputs, files):
+            f.write(output.begin())
+
+        rows = packed.shape[1]
+        for label, base_address, glyphs in sections:
+            values = row_hex(glyphs)
+            addresses = base_address + np.arange(values.shape[0])
+            address_hex = hex_matrix(addresses, max(4, len(f"{int(addresses.max(initial=0)):X}")))
+            raw = glyphs.reshape(values.shape[0], -1)
+            blocks = []
+            for output, f in zip(outputs, files):
+                columns = output.target["columns"]
+                byte_columns = slice(None) if columns.start is None else slice(columns.start // 2, columns.stop // 2)
+                f.write(output.move_to(base_address))
+                data, offsets = output.prepare(address_hex, values[:, columns], raw[:, byte_columns], rows)
+                blocks.append((data, offsets.tolist()))
+            for i, char in enumerate(chars):
+                for output, f, (data, offsets) in zip(outputs, files, blocks):
+                    f.write(output.glyph(label, char, data[offsets[i]:offsets[i + 1]]))
+
+        for output, f in zip(outputs, files):
+            # Only rewind over a ',\n' when words were written, never into the header
+            if isinstance(output, CoeOutput) and output.address:
+                f.seek(-2, os.SEEK_END)
+            f.write(output.end())
+    finally:
+        for f in files:
+            f.close()
+
+    paths = [output.path for output in outputs]
+    print(f"✅ Wrote {len(paths)} memory files: {', '.join(os.path.basename(path) for path in paths)}")
+    return paths
+
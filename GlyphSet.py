@@ -0,0 +1,143 @@
+"""
+Lazy glyph mapping with the interface of `generate_xbm_data`'s result.
+
+The preview, the diff tool and single-glyph patches only look at a handful of
+glyphs, but `generate_xbm_data` renders the whole `char_list` up front. A
+GlyphSet is a read-only mapping {char: [[row bytes], ...]} over the same
+`char_list` that renders and packs a glyph the first time it is accessed and
+keeps the packed rows, so partial consumers pay for what they touch.
+
+Glyphs are rendered by calling the given `generate_xbm_data` (any of the
+converter versions) on just the characters needed; it treats every character
+independently, so a glyph comes out identical to a full render. `prefetch` and
+`prefetch_range` render several glyphs in one call (one font load).
+
+Iteration follows the key order of the full render and skips characters the
+renderer drops, so iterating (`len()`, `items()`, `pack_glyphs`, ...) first renders
+every glyph that is not cached yet, in one call.
+"""
+import time
+from collections.abc import Mapping
+
+import numpy as np
+
+from Glyphs import glyph_order, pack_glyphs
+
+
+class GlyphSet(Mapping):
+    """Read-only {char: [[row bytes], ...]} that renders on first access."""
+
+    def __init__(self, generate_xbm_data, ttf_path, char_list, forced_height, max_width, canvas_width, canvas_height,
+                 threshold_value=128, padding_top=0, padding_bottom=0):
+        self.generate_xbm_data = generate_xbm_data
+        self.ttf_path = ttf_path
+        self.chars = glyph_order(char_list)
+        self.canvas_width = canvas_width
+        self.canvas_height = canvas_height
+        self.settings = {
+            "forced_height": forced_height,
+            "max_width": max_width,
+            "canvas_width": canvas_width,
+            "canvas_height": canvas_height,
+            "threshold_value": threshold_value,
+            "padding_top": padding_top,
+            "padding_bottom": padding_bottom,
+        }
+        self._known = set(self.chars)
+        self._packed = {}
+        self._missing = set()
+        self.render_calls = 0
+
+    def _render(self, chars):
+        """Renders the characters that are neither cached nor known to be missing."""
+        chars = [char for char in dict.fromkeys(chars)
+                 if char in self._known and char not in self._packed and char not in self._missing]
+        if not chars:
+            return
+        xbm_data = self.generate_xbm_data(self.ttf_path, chars, **self.settings)
+        self.render_calls += 1
+        for char in chars:
+            if char in xbm_data:
+                self._packed[char] = np.array(xbm_data[char], dtype=np.uint8).reshape(self.canvas_height, -1)
+            else:
+                self._missing.add(char)
+
+    def prefetch(self, chars):
+        """Renders all of `chars` (that are in the char list) in one call. Returns self."""
+        self._render(chars)
+        return self
+
+    def prefetch_range(self, first, last):
+        """Renders every char-list character from `first` to `last` (characters or code points, inclusive)."""
+        first = ord(first) if isinstance(first, str) else first
+        last = ord(last) if isinstance(last, str) else last
+        return self.prefetch(char for char in self.chars if first <= ord(char) <= last)
+
+    def __getitem__(self, char):
+        if char not in self._packed:
+            self._render([char])
+            if char not in self._packed:
+                raise KeyError(char)
+        return self._packed[char].tolist()
+
+    def __contains__(self, char):
+        if char not in self._known:
+            return False
+        self._render([char])
+        return char in self._packed
+
+    def __iter__(self):
+        self._render(self.chars)
+        return (char for char in self.chars if char in self._packed)
+
+    def __len__(self):
+        self._render(self.chars)
+        return len(self._packed)
+
+    @property
+    def rendered(self):
+        """Number of glyphs rendered so far."""
+        return len(self._packed)
+
+    def packed(self, chars=None):
+        """
+        Returns (chars, packed) like `pack_glyphs` for `chars` (every glyph by default),
+        rendering the missing ones in one call.
+        """
+        chars = self.chars if chars is None else glyph_order(chars)
+        self._render(chars)
+        chars = [char for char in chars if char in self._packed]
+        if not chars:
+            return pack_glyphs({}, self.canvas_width, self.canvas_height)
+        return chars, np.stack([self._packed[char] for char in chars])
+
+    def __repr__(self):
+        return (f"GlyphSet({len(self.chars)} chars, {self.rendered} rendered, "
+                f"{self.canvas_width}x{self.canvas_height})")
+
+
+def benchmark_glyph_set(generate_xbm_data, ttf_path, char_list, used_chars, forced_height, max_width, canvas_width,
+                        canvas_height, **options):
+    """
+    Compares rendering the whole `char_list` with a GlyphSet for a consumer that only
+    reads `used_chars`, and checks that the glyphs it reads are identical.
+    """
+    start = time.perf_counter()
+    all_xbm_data = generate_xbm_data(ttf_path, char_list, forced_height, max_width, canvas_width, canvas_height,
+                                     **options)
+    full_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    glyphs = GlyphSet(generate_xbm_data, ttf_path, char_list, forced_height, max_width, canvas_width, canvas_height,
+                      **options)
+    used = {char: glyphs[char] for char in used_chars if char in glyphs}
+    lazy_seconds = time.perf_counter() - start
+
+    different = [char for char in used if used[char] != all_xbm_data.get(char)]
+    if different:
+        raise ValueError(f"GlyphSet differs from the full render for {', '.join(map(repr, different))}")
+    if glyphs.rendered != len(used):
+        raise ValueError(f"GlyphSet rendered {glyphs.rendered} glyphs for {len(used)} used ones")
+    print(f"✅ {len(used)} of {len(all_xbm_data)} glyphs: full render {full_seconds * 1000:.1f} ms, "
+          f"lazy {lazy_seconds * 1000:.1f} ms ({full_seconds / lazy_seconds:.1f}x faster)")
+    return full_seconds, lazy_seconds
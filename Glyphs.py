@@ -0,0 +1,103 @@
+"""
+Packed glyph helpers shared by the ROM writers.
+
+`generate_xbm_data` returns {char: [[row bytes], ...]}. The helpers below turn that
+into one uint8 array of shape (glyphs, canvas_height, canvas_width // 8) so the ROM
+formats can work on the whole glyph set at once instead of row by row.
+"""
+import numpy as np
+
+# Character list used by `generate_files`
+DEFAULT_CHAR_LIST = (
+    [chr(i) for i in range(0x20, 0x61)] +
+    [
+        chr(0x7B), chr(0x7C), chr(0x7D), chr(0x7E), chr(0xB0), chr(0xB1),
+        chr(0x2026), chr(0x2190), chr(0x2191), chr(0x2192), chr(0x2193),
+        chr(0x21CC), chr(0x25BC), chr(0x2713), chr(0x20)
+    ]
+)
+
+
+def glyph_order(char_list):
+    """
+    Returns the characters in ROM slot order, i.e. the key order of the dict
+    `generate_xbm_data` builds (duplicates such as the trailing space collapse).
+    """
+    return list(dict.fromkeys(char_list))
+
+
+def grid_size(canvas_width, canvas_height):
+    """Returns the (grid_width, grid_height) glyphs are placed in for a canvas."""
+    if canvas_width == 32 and canvas_height == 64:
+        return 17, 39
+    return canvas_width, canvas_height
+
+
+def place_glyph(bitmap, canvas_width, canvas_height, padding_top=0):
+    """
+    Places a 0/1 glyph bitmap on the canvas the way `generate_xbm_data` does:
+    centered in the 17x39 grid for 32x64, otherwise `padding_top` rows down and
+    centered horizontally. Raises ValueError if the bitmap does not fit.
+    """
+    bitmap = np.asarray(bitmap, dtype=np.uint8)
+    height, width = bitmap.shape
+    canvas = np.zeros((canvas_height, canvas_width), dtype=np.uint8)
+    if canvas_width == 32 and canvas_height == 64:
+        grid_width, grid_height = grid_size(canvas_width, canvas_height)
+        top = max((grid_height - height) // 2, 0)
+        left = max((grid_width - width) // 2, 0)
+    else:
+        top = padding_top
+        left = (canvas_width - width) // 2
+    if top < 0 or left < 0 or top + height > canvas_height or left + width > canvas_width:
+        raise ValueError(f"{width}x{height} glyph does not fit the {canvas_width}x{canvas_height} canvas")
+    canvas[top:top + height, left:left + width] = bitmap
+    return canvas
+
+
+def canvas_rows(canvas):
+    """Packs a 0/1 canvas into `generate_xbm_data` rows (leftmost pixel in bit 0)."""
+    return np.packbits(np.asarray(canvas, dtype=np.uint8), axis=1, bitorder="little")
+
+
+def pack_glyphs(all_xbm_data, canvas_width, canvas_height):
+    """
+    Packs an `all_xbm_data` dict into (chars, packed).
+
+    `chars` keeps the dict insertion order (which is the ROM slot order) and `packed`
+    is a uint8 array of shape (len(chars), canvas_height, canvas_width // 8).
+    """
+    chars = list(all_xbm_data.keys())
+    packed = np.zeros((len(chars), canvas_height, canvas_width // 8), dtype=np.uint8)
+    for i, char in enumerate(chars):
+        packed[i] = np.asarray(all_xbm_data[char], dtype=np.uint8)
+    return chars, packed
+
+
+def unpack_glyphs(chars, packed):
+    """Inverse of `pack_glyphs`, returns an `all_xbm_data` style dict."""
+    return {char: packed[i].tolist() for i, char in enumerate(chars)}
+
+
+def strikeout_rows(canvas_height):
+    """Returns the (start, end) rows `write_mif` fills with 0xFF for strikeout glyphs."""
+    middle_start = (canvas_height // 2) - 1
+    return middle_start, middle_start + 3
+
+
+def section_words(packed):
+    """
+    Splits packed rows into the 16-bit words the ROM stores.
+
+    Returns a uint16 array of shape (glyphs, rows, canvas_width // 16). For 32x64
+    word 0 is the High half and word 1 the Low half, matching the split MIF files.
+    """
+    pairs = packed.reshape(packed.shape[0], packed.shape[1], -1, 2).astype(np.uint16)
+    return (pairs[..., 0] << 8) | pairs[..., 1]
+
+
+def packed_from_words(words):
+    """Inverse of `section_words`: rebuilds packed row bytes from 16-bit ROM words."""
+    words = np.asarray(words, dtype=np.uint16)
+    pairs = np.stack([(words >> 8).astype(np.uint8), (words & 0xFF).astype(np.uint8)], axis=-1)
+    return pairs.reshape(words.shape[0], words.shape[1], -1)
@@ -0,0 +1,304 @@
+"""
+Golden-output harness: byte equality and per-stage time/memory budgets.
+
+Any optimization of `generate_xbm_data`, `write_xbm`, `write_mif` or the binary
+assemblers risks silently changing ROM bytes. `make_golden` renders a font with
+the current implementations (the functions of eheh.py and the variant scripts,
+loaded without starting their GUI) and stores every output next to a manifest
+of SHA-256 hashes and the render settings:
+
+  - FontRom64.xbm / FontRom32.xbm
+  - FontRom64.mif / FontRom32.mif and the split FontRom16x64_Low/High.mif
+  - FontRomCombined_<variant>.bin for every `write_combined_binary` copy
+
+`check_golden` renders the same font again, runs the new code paths on it
+(the packed-glyph round trip the new writers start from, MifWriter, Emit,
+Layout, Matrix, Rom) and asserts that every file they produce is byte-identical
+to its golden. Each stage is timed and its peak Python allocation traced
+(tracemalloc, so times include the tracing overhead) and reported against a
+budget; overruns fail the check only with `enforce_budgets`, since wall-clock
+times depend on the machine. A replacement renderer is checked by passing it
+as `generate_xbm_data`.
+
+Any TTF works; the manifest records the font's SHA-256 so goldens are only
+compared against renders of the same font. tests/test_golden.py runs both steps
+under pytest with tests/fonts/Lato-Regular.ttf (SIL OFL 1.1, see
+tests/fonts/OFL.txt) or the font named by GOLDEN_FONT, and enforces the budgets
+when GOLDEN_BUDGETS is set.
+"""
+import ast
+import contextlib
+import functools
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from Emit import emit_memories
+from Glyphs import DEFAULT_CHAR_LIST, pack_glyphs, unpack_glyphs
+from Layout import LAYOUTS, write_layout_binary
+from Matrix import build_matrix
+from MifWriter import write_mif
+from Rom import build_combined_image
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_FILE = "golden.json"
+
+# The GUI defaults of eheh.py / Converter_1.0.py
+RENDER_SETTINGS = {
+    "32x64": {"forced_height": 39, "max_width": 17, "padding_top": 0, "padding_bottom": 2},
+    "16x32": {"forced_height": 28, "max_width": 13, "padding_top": 2, "padding_bottom": 2},
+}
+CANVASES = {"32x64": (32, 64, "FontRom64"), "16x32": (16, 32, "FontRom32")}
+SPLIT_MIF_FILES = {"low": "FontRom16x64_Low.mif", "high": "FontRom16x64_High.mif"}
+
+# Script and argument order of every `write_combined_binary` copy
+LEGACY_BINARIES = {
+    "Bin": ("Bin.py", ("16x32", "high", "low")),
+    "Binwrite2": ("Binwrite2.py", ("16x32", "high", "low")),
+    "Bin2": ("Bin2.py", ("low", "high", "16x32")),
+    "Okok": ("Okok.py", ("low", "high", "16x32")),
+    "St": ("St.py", ("low", "high", "16x32")),
+    "Sum": ("Sum.py", ("low", "high", "16x32")),
+    "Wellok": ("Wellok.py", ("low", "high", "16x32")),
+    "Workingish": ("Workingish.py", ("low", "high", "16x32")),
+    "eheh": ("eheh.py", ("low", "high", "16x32")),
+    "Converter_1.0": ("Converter_1.0.py", ("low", "high", "16x32")),
+}
+
+# {stage: (seconds, megabytes)}; generous for the default character list
+DEFAULT_BUDGETS = {
+    "render": (10.0, 64),
+    "pack": (2.0, 16),
+    "mif": (1.0, 32),
+    "emit": (1.0, 32),
+    "layout": (2.0, 32),
+    "matrix": (2.0, 64),
+    "rom": (0.5, 16),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def load_legacy(script):
+    """
+    Returns the functions of a legacy script (with its imports, except tkinter) as
+    a namespace dict, without running the GUI code at module level.
+    """
+    path = os.path.join(REPO_DIR, script)
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    body = []
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom):
+            modules = [node.module or ""]
+        elif isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.FunctionDef):
+            body.append(node)
+            continue
+        else:
+            continue
+        if not any(module.split(".")[0] == "tkinter" for module in modules):
+            body.append(node)
+    namespace = {"__name__": os.path.splitext(script)[0]}
+    exec(compile(ast.Module(body=body, type_ignores=[]), path, "exec"), namespace)
+    return namespace
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def golden_files():
+    """Names of every golden file, XBM and MIF first, then one binary per variant."""
+    names = [stem + extension for _, _, stem in CANVASES.values() for extension in (".xbm", ".mif")]
+    names += list(SPLIT_MIF_FILES.values())
+    names += [f"FontRomCombined_{variant}.bin" for variant in LEGACY_BINARIES]
+    return names
+
+
+def mif_paths(directory):
+    """{source name: path} of the three MIF files the binaries are built from."""
+    paths = {name: os.path.join(directory, file_name) for name, file_name in SPLIT_MIF_FILES.items()}
+    paths["16x32"] = os.path.join(directory, CANVASES["16x32"][2] + ".mif")
+    return paths
+
+
+def render_all(generate_xbm_data, ttf_path, char_list):
+    """{canvas name: all_xbm_data} with the GUI default settings."""
+    return {
+        canvas: generate_xbm_data(ttf_path, char_list, canvas_width=width, canvas_height=height,
+                                  **RENDER_SETTINGS[canvas])
+        for canvas, (width, height, _) in CANVASES.items()
+    }
+
+
+def make_golden(ttf_path, golden_dir, char_list=None):
+    """
+    Writes the golden outputs of the current implementations for `ttf_path` to
+    `golden_dir`, plus the manifest. Returns the manifest.
+    """
+    char_list = DEFAULT_CHAR_LIST if char_list is None else char_list
+    eheh = load_legacy("eheh.py")
+    os.makedirs(golden_dir, exist_ok=True)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        xbm_data = render_all(eheh["generate_xbm_data"], ttf_path, char_list)
+        for canvas, (width, height, stem) in CANVASES.items():
+            eheh["write_xbm"](xbm_data[canvas], os.path.join(golden_dir, stem + ".xbm"), width, height)
+            eheh["write_mif"](xbm_data[canvas], os.path.join(golden_dir, stem + ".mif"), width, height)
+
+        sources = mif_paths(golden_dir)
+        for variant, (script, argument_order) in LEGACY_BINARIES.items():
+            output_file = os.path.join(golden_dir, f"FontRomCombined_{variant}.bin")
+            load_legacy(script)["write_combined_binary"](*(sources[name] for name in argument_order), output_file)
+
+    # Converter_1.0.py leaves a debug log next to its binary
+    debug_file = os.path.join(golden_dir, "FontRomCombined_Converter_1.0_debug.txt")
+    if os.path.exists(debug_file):
+        os.remove(debug_file)
+
+    manifest = {
+        "font": os.path.basename(ttf_path),
+        "font_sha256": file_sha256(ttf_path),
+        "char_list": "".join(char_list),
+        "render_settings": RENDER_SETTINGS,
+        "files": {name: file_sha256(os.path.join(golden_dir, name)) for name in golden_files()},
+    }
+    with open(os.path.join(golden_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    print(f"✅ {len(manifest['files'])} golden files for {manifest['font']} written to {golden_dir}")
+    return manifest
+
+
+def run_stage(function, *args, **kwargs):
+    """Runs `function` with its output silenced; returns (result, seconds, peak traced bytes)."""
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = function(*args, **kwargs)
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, seconds, peak
+
+
+def check_golden(ttf_path, golden_dir, work_dir=None, generate_xbm_data=None, budgets=None, enforce_budgets=True):
+    """
+    Runs every stage on `ttf_path`, compares the files it produces with the goldens
+    in `golden_dir` and reports the time and memory budgets (DEFAULT_BUDGETS updated
+    with `budgets`). Raises AssertionError listing every mismatch, and every overrun
+    when `enforce_budgets` is set; returns the per-stage results otherwise.
+    """
+    with open(os.path.join(golden_dir, MANIFEST_FILE), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if file_sha256(ttf_path) != manifest["font_sha256"]:
+        raise ValueError(f"{ttf_path} is not the font the goldens were made from ({manifest['font']})")
+    if manifest["render_settings"] != RENDER_SETTINGS:
+        raise ValueError("The goldens were made with different render settings; regenerate them")
+    budgets = {**DEFAULT_BUDGETS, **(budgets or {})}
+    eheh = load_legacy("eheh.py")
+    generate_xbm_data = generate_xbm_data or eheh["generate_xbm_data"]
+    char_list = list(manifest["char_list"])
+
+    with contextlib.ExitStack() as stack:
+        if work_dir is None:
+            work_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix="golden_"))
+
+        def stage_dir(name):
+            path = os.path.join(work_dir, name)
+            os.makedirs(path, exist_ok=True)
+            return path
+
+        def write_packed_xbm_files(xbm_data, directory):
+            # The legacy XBM text, written from the packed arrays every new writer starts from
+            for canvas, (width, height, stem) in CANVASES.items():
+                repacked = unpack_glyphs(*pack_glyphs(xbm_data[canvas], width, height))
+                eheh["write_xbm"](repacked, os.path.join(directory, stem + ".xbm"), width, height)
+
+        def write_mif_files(xbm_data, directory):
+            for canvas, (width, height, stem) in CANVASES.items():
+                write_mif(xbm_data[canvas], os.path.join(directory, stem + ".mif"), width, height)
+
+        def emit_mif_files(xbm_data, directory):
+            for canvas, (width, height, stem) in CANVASES.items():
+                emit_memories(xbm_data[canvas], os.path.join(directory, stem + ".mif"), width, height, formats=("mif",))
+
+        def write_layouts(sources, directory):
+            for variant in LAYOUTS:
+                write_layout_binary(variant, os.path.join(directory, f"FontRomCombined_{variant}.bin"),
+                                    sources["16x32"], sources["high"], sources["low"])
+
+        def build_rom(xbm_data, directory):
+            image = build_combined_image(*pack_glyphs(xbm_data["16x32"], 16, 32),
+                                         *pack_glyphs(xbm_data["32x64"], 32, 64))
+            with open(os.path.join(directory, "FontRomCombined_eheh.bin"), "wb") as bin_file:
+                bin_file.write(image)
+
+        results = []
+        failures = []
+
+        def stage(name, produced, function, *args):
+            """Runs a stage and compares {golden name: produced path}."""
+            result, seconds, peak = run_stage(function, *args)
+            mismatches = [golden for golden, path in produced.items()
+                          if not os.path.exists(path) or file_sha256(path) != manifest["files"][golden]]
+            time_budget, memory_budget = budgets[name]
+            problems = [f"{golden} differs from the golden" for golden in mismatches]
+            overruns = []
+            if seconds > time_budget:
+                overruns.append(f"{seconds:.3f} s over the {time_budget} s budget")
+            if peak > memory_budget * 1024 * 1024:
+                overruns.append(f"{peak / 1024 / 1024:.1f} MB over the {memory_budget} MB budget")
+            if enforce_budgets:
+                problems += overruns
+            failures.extend(f"{name}: {problem}" for problem in problems)
+            results.append({"stage": name, "seconds": seconds, "peak_bytes": peak,
+                            "files": len(produced), "mismatches": mismatches, "overruns": overruns})
+            mark = "❌" if problems else "⚠" if overruns else "✅"
+            print(f"{mark} {name:<7} {seconds:8.3f} s / {time_budget:<5} "
+                  f"{peak / 1024 / 1024:7.1f} MB / {memory_budget:<4} {len(produced) - len(mismatches)}/"
+                  f"{len(produced)} files identical")
+            return result
+
+        xbm_data = stage("render", {}, render_all, generate_xbm_data, ttf_path, char_list)
+
+        directory = stage_dir("pack")
+        stage("pack", {stem + ".xbm": os.path.join(directory, stem + ".xbm") for _, _, stem in CANVASES.values()},
+              write_packed_xbm_files, xbm_data, directory)
+
+        mif_files = [stem + ".mif" for _, _, stem in CANVASES.values()] + list(SPLIT_MIF_FILES.values())
+        for name, function in (("mif", write_mif_files), ("emit", emit_mif_files)):
+            directory = stage_dir(name)
+            stage(name, {file_name: os.path.join(directory, file_name) for file_name in mif_files},
+                  function, xbm_data, directory)
+
+        directory = stage_dir("layout")
+        stage("layout", {f"FontRomCombined_{variant}.bin": os.path.join(directory, f"FontRomCombined_{variant}.bin")
+                         for variant in LAYOUTS},
+              write_layouts, mif_paths(os.path.join(work_dir, "mif")), directory)
+
+        directory = stage_dir("matrix")
+        stage("matrix", {f"FontRomCombined_{variant}.bin": os.path.join(
+                  directory, f"FontRomCombined_{variant}_{LAYOUTS[variant].get('checksum', 'none')}.bin")
+                  for variant in LAYOUTS},
+              build_matrix, xbm_data["16x32"], xbm_data["32x64"], directory)
+
+        directory = stage_dir("rom")
+        stage("rom", {"FontRomCombined_eheh.bin": os.path.join(directory, "FontRomCombined_eheh.bin")},
+              build_rom, xbm_data, directory)
+
+    if failures:
+        raise AssertionError("Golden check failed:\n  " + "\n  ".join(failures))
+    print(f"✅ All {sum(result['files'] for result in results)} outputs match the goldens in {golden_dir}")
+    return results
@@ -0,0 +1,147 @@
+"""
+Optional self-describing header for the combined ROM, with a CRC-32 per section.
+
+The combined binary only carries one 16-bit sum over all 81918 bytes, so the device
+has to read everything to validate anything. The header lists every section with
+its geometry and CRC-32, so firmware can check just the section it is about to use
+and host tools can point at the corrupted section.
+
+The header lives in the reserved tail of the 16x32 Strikeout region (HEADER_OFFSET),
+which leaves room for HEADER_SLOTS_16X32 glyphs there instead of 128.
+
+Header layout (little-endian):
+  "FROM", u8 format version, u8 section count, u16 header length
+  per section: u8 id, u8 canvas_width, u8 canvas_height, u8 grid_width,
+               u8 grid_height, u8 glyph count, u16 reserved,
+               u32 offset, u32 length, u32 CRC-32
+  u32 CRC-32 of everything above
+
+CRC-32 is the standard reflected 0xEDB88320 polynomial (same as zlib). `crc32`
+below is the table-driven reference the firmware implements; host tools use zlib.
+"""
+import struct
+import zlib
+
+from Glyphs import grid_size
+from Rom import BASE_OFFSETS, STRIKEOUT_ADDRESS_32X64, byte_sum_checksum
+
+HEADER_MAGIC = b"FROM"
+HEADER_VERSION = 1
+HEADER_OFFSET = 0x3F00
+HEADER_SIZE = 0x100
+HEADER_SLOTS_16X32 = (HEADER_OFFSET - BASE_OFFSETS["16x32 Strikeout"]) // 64
+
+HEADER_START = struct.Struct("<4sBBH")
+SECTION_ENTRY = struct.Struct("<BBBBBBHIII")
+
+# Section id, name, canvas, start and end (bytes)
+SECTIONS = [
+    (0, "16x32 Normal", (16, 32), BASE_OFFSETS["16x32 Normal"], BASE_OFFSETS["16x32 Strikeout"]),
+    (1, "16x32 Strikeout", (16, 32), BASE_OFFSETS["16x32 Strikeout"], HEADER_OFFSET),
+    (2, "32x64 High Normal", (32, 64), BASE_OFFSETS["32x64 High"],
+     BASE_OFFSETS["32x64 High"] + STRIKEOUT_ADDRESS_32X64 * 2),
+    (3, "32x64 High Strikeout", (32, 64), BASE_OFFSETS["32x64 High"] + STRIKEOUT_ADDRESS_32X64 * 2,
+     BASE_OFFSETS["32x64 Low"]),
+    (4, "32x64 Low Normal", (32, 64), BASE_OFFSETS["32x64 Low"],
+     BASE_OFFSETS["32x64 Low"] + STRIKEOUT_ADDRESS_32X64 * 2),
+    (5, "32x64 Low Strikeout", (32, 64), BASE_OFFSETS["32x64 Low"] + STRIKEOUT_ADDRESS_32X64 * 2, None),
+]
+
+
+def make_crc32_table():
+    """The 256-entry lookup table for the reflected CRC-32 polynomial."""
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xEDB88320 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+CRC32_TABLE = make_crc32_table()
+
+
+def crc32(data, crc=0):
+    """Table-driven CRC-32 reference, identical to zlib.crc32."""
+    crc ^= 0xFFFFFFFF
+    for byte in data:
+        crc = CRC32_TABLE[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+    return crc ^ 0xFFFFFFFF
+
+
+def section_table(image_size):
+    """Returns [(id, name, (canvas_width, canvas_height), start, end)] for an image size."""
+    return [(section_id, name, canvas, start, image_size - 2 if end is None else end)
+            for section_id, name, canvas, start, end in SECTIONS]
+
+
+def build_rom_header(image, glyph_count_16x32, glyph_count_32x64):
+    """Builds the header bytes describing `image`."""
+    entries = bytearray()
+    sections = section_table(len(image))
+    for section_id, name, (canvas_width, canvas_height), start, end in sections:
+        grid_width, grid_height = grid_size(canvas_width, canvas_height)
+        glyph_count = glyph_count_16x32 if canvas_width == 16 else glyph_count_32x64
+        entries += SECTION_ENTRY.pack(section_id, canvas_width, canvas_height, grid_width, grid_height,
+                                      glyph_count, 0, start, end - start, zlib.crc32(image[start:end]))
+    header = HEADER_START.pack(HEADER_MAGIC, HEADER_VERSION, len(sections),
+                               HEADER_START.size + len(entries) + 4) + entries
+    return header + struct.pack("<I", zlib.crc32(header))
+
+
+def add_rom_header(image, glyph_count_16x32, glyph_count_32x64):
+    """
+    Returns a copy of a combined ROM image with the header written at HEADER_OFFSET
+    and the trailing byte-sum checksum updated.
+    """
+    if glyph_count_16x32 > HEADER_SLOTS_16X32:
+        raise ValueError(f"16x32 strikeout glyphs would overlap the ROM header "
+                         f"({glyph_count_16x32} glyphs, {HEADER_SLOTS_16X32} fit)")
+    image = bytearray(image)
+    if any(image[HEADER_OFFSET:HEADER_OFFSET + HEADER_SIZE]):
+        raise ValueError(f"Reserved header area at 0x{HEADER_OFFSET:04X} is not empty")
+    header = build_rom_header(image, glyph_count_16x32, glyph_count_32x64)
+    image[HEADER_OFFSET:HEADER_OFFSET + len(header)] = header
+    image[-2:] = byte_sum_checksum(image[:-2]).to_bytes(2, "little")
+    return bytes(image)
+
+
+def read_rom_header(image):
+    """Parses the header; returns None when the image has no (valid) header."""
+    magic, version, section_count, length = HEADER_START.unpack_from(image, HEADER_OFFSET)
+    if magic != HEADER_MAGIC or length > HEADER_SIZE:
+        return None
+    header = image[HEADER_OFFSET:HEADER_OFFSET + length]
+    if zlib.crc32(header[:-4]) != struct.unpack_from("<I", header, length - 4)[0]:
+        return None
+    names = {section_id: name for section_id, name, *_ in SECTIONS}
+    sections = {}
+    for i in range(section_count):
+        (section_id, canvas_width, canvas_height, grid_width, grid_height, glyph_count, _,
+         offset, section_length, crc) = SECTION_ENTRY.unpack_from(header, HEADER_START.size + i * SECTION_ENTRY.size)
+        sections[names.get(section_id, f"Section {section_id}")] = {
+            "canvas": (canvas_width, canvas_height),
+            "grid": (grid_width, grid_height),
+            "glyphs": glyph_count,
+            "offset": offset,
+            "length": section_length,
+            "crc32": crc,
+        }
+    return {"version": version, "sections": sections}
+
+
+def verify_sections(image, names=None):
+    """
+    Checks the CRC-32 of the named sections (all by default) against the header.
+    Returns {name: True/False}; raises ValueError when the image has no header.
+    """
+    header = read_rom_header(image)
+    if header is None:
+        raise ValueError("ROM image has no valid header")
+    results = {}
+    for name, section in header["sections"].items():
+        if names is None or name in names:
+            data = image[section["offset"]:section["offset"] + section["length"]]
+            results[name] = zlib.crc32(data) == section["crc32"]
+    return results
@@ -0,0 +1,279 @@
+"""
+Layout-driven assembler for the combined font ROM.
+
+Every copy of `write_combined_binary` (Bin.py, Bin2.py, Binwrite2.py, Okok.py,
+St.py, Sum.py, Wellok.py, Workingish.py, Converter_1.0.py, eheh.py) hardcodes its
+own argument order, strikeout remapping, padding and checksum. Here a layout is a
+declarative spec and one assembler builds any of them:
+
+    {
+        "size": 81920,                    # image size in bytes
+        "fill": 0x00,                     # byte for everything not written
+        "checksum": "byte_sum_le",        # see CHECKSUMS, or "none"
+        "checksum_offset": None,          # default: the last 2 bytes
+        "sections": [                     # written in this order
+            {"source": "16x32",           # "16x32", "32x64 High" or "32x64 Low"
+             "remap": "index",            # see REMAPS
+             "base": 0x0000,              # byte offset, or "follow" (after the previous section)
+             "end": 0x4000,               # region end, default: the checksum / image end
+             "strikeout_offset": 0x2000,  # for the "index" and "split" remaps
+             "overflow": "error"},        # or "clip": drop words outside the region
+            ...
+        ],
+    }
+
+A source is the content of one MIF file as `read_mif` returns it (file-order
+`addresses`, `values` and `strikeout` flags); `glyph_sources` builds the same
+arrays straight from packed glyphs, so no MIF has to be written or parsed.
+
+Regions are checked for overlaps and every section's placement for overflow
+before anything is written; the image is then built in one pass. The LAYOUTS
+presets reproduce each legacy variant byte for byte.
+"""
+import numpy as np
+
+from Glyphs import section_words
+from Mif import read_mif
+from MifWriter import STRIKEOUT_ADDRESS
+from Rom import byte_sum_checksum
+from Variants import strikeout
+
+SOURCES = ("16x32", "32x64 High", "32x64 Low")
+
+
+def word_sum_le_checksum(data):
+    """Sum of the little-endian 16-bit words, low 16 bits (Sum.py / Wellok.py)."""
+    return int(np.frombuffer(bytes(data), dtype="<u2").sum(dtype=np.uint64)) & 0xFFFF
+
+
+def ones_complement_be_checksum(data):
+    """One's complement of the big-endian 16-bit word sum (Bin2.py, Okok.py, St.py, ...)."""
+    return ~int(np.frombuffer(bytes(data), dtype=">u2").sum(dtype=np.uint64)) & 0xFFFF
+
+
+# name: (function over the bytes before the checksum, byte order it is stored in)
+CHECKSUMS = {
+    "byte_sum_le": (byte_sum_checksum, "little"),
+    "word_sum_le": (word_sum_le_checksum, "little"),
+    "ones_complement_be": (ones_complement_be_checksum, "big"),
+}
+
+
+def remap_address(source, section):
+    """Byte offset = MIF address * 2."""
+    return source["addresses"].astype(np.int64) * 2
+
+
+def remap_min_address(source, section):
+    """Like "address", after subtracting the lowest address (Workingish.py)."""
+    addresses = source["addresses"].astype(np.int64)
+    return (addresses - addresses.min(initial=0)) * 2
+
+
+def remap_split(source, section):
+    """Addresses from 0x2000 (write_mif's strikeout copies) start at `strikeout_offset` (Bin2.py)."""
+    addresses = source["addresses"].astype(np.int64)
+    return np.where(addresses < STRIKEOUT_ADDRESS, addresses * 2,
+                    section["strikeout_offset"] + (addresses - STRIKEOUT_ADDRESS) * 2)
+
+
+def remap_index(source, section):
+    """
+    Ignores the addresses: normal entries are numbered from 0, strikeout entries
+    from `strikeout_offset` (Okok.py, Sum.py, Wellok.py, eheh.py).
+    """
+    is_strikeout = source["strikeout"]
+    index = np.where(is_strikeout, np.cumsum(is_strikeout) - 1, np.cumsum(~is_strikeout) - 1)
+    return np.where(is_strikeout, section["strikeout_offset"], 0) + index.astype(np.int64) * 2
+
+
+def remap_contiguous(source, section):
+    """Strikeout entries directly follow the normal ones (St.py)."""
+    is_strikeout = source["strikeout"]
+    normal_count = int((~is_strikeout).sum())
+    index = np.where(is_strikeout, normal_count + np.cumsum(is_strikeout) - 1, np.cumsum(~is_strikeout) - 1)
+    return index.astype(np.int64) * 2
+
+
+def remap_order(source, section):
+    """Every entry in file order, one word after the other (Converter_1.0.py)."""
+    return np.arange(len(source["values"]), dtype=np.int64) * 2
+
+
+REMAPS = {
+    "address": remap_address,
+    "min_address": remap_min_address,
+    "split": remap_split,
+    "index": remap_index,
+    "contiguous": remap_contiguous,
+    "order": remap_order,
+}
+
+
+def _fixed_slots(remap_16x32, checksum, overflow_16x32="error", strikeout_offset=0x2000):
+    """The 16x32 / High / Low layout at 0x0000 / 0x4000 / 0xC000 most variants share."""
+    return {
+        "size": 81920,
+        "fill": 0x00,
+        "checksum": checksum,
+        "sections": [
+            {"source": "16x32", "remap": remap_16x32, "base": 0x0000, "end": 0x4000,
+             "strikeout_offset": strikeout_offset, "overflow": overflow_16x32},
+            {"source": "32x64 High", "remap": "address", "base": 0x4000, "end": 0xC000},
+            {"source": "32x64 Low", "remap": "address", "base": 0xC000},
+        ],
+    }
+
+
+# The 16x32 strikeout copies sit at MIF address 0x2000, i.e. byte 0x4000 with the
+# plain "address" remap: Bin.py, Binwrite2.py and Workingish.py write them there and
+# the 32x64 High section then overwrites them, which "clip" reproduces.
+LAYOUTS = {
+    "Bin": _fixed_slots("address", "none", overflow_16x32="clip"),
+    "Binwrite2": _fixed_slots("address", "none", overflow_16x32="clip"),
+    "Workingish": _fixed_slots("min_address", "ones_complement_be", overflow_16x32="clip"),
+    "Bin2": _fixed_slots("split", "ones_complement_be"),
+    "Okok": _fixed_slots("index", "ones_complement_be"),
+    "St": _fixed_slots("contiguous", "ones_complement_be"),
+    "Sum": _fixed_slots("index", "word_sum_le"),
+    "Wellok": _fixed_slots("index", "word_sum_le"),
+    "eheh": _fixed_slots("index", "byte_sum_le"),
+    "Converter_1.0": {
+        "size": 81920,
+        "fill": 0x00,
+        "checksum": "ones_complement_be",
+        "sections": [
+            {"source": "16x32", "remap": "order", "base": 0x0000},
+            {"source": "32x64 High", "remap": "order", "base": "follow"},
+            {"source": "32x64 Low", "remap": "order", "base": "follow"},
+        ],
+    },
+}
+
+
+def glyph_sources(chars_16x32, packed_16x32, chars_32x64, packed_32x64):
+    """
+    Builds the three sources from packed glyphs, with the addresses, words and
+    strikeout flags `write_mif` would write to FontRom32.mif and the split
+    FontRom16x64_High.mif / FontRom16x64_Low.mif files.
+    """
+    def source(normal_words, strikeout_words):
+        normal_words, strikeout_words = normal_words.ravel(), strikeout_words.ravel()
+        return {
+            "addresses": np.concatenate([np.arange(normal_words.size),
+                                         STRIKEOUT_ADDRESS + np.arange(strikeout_words.size)]).astype(np.uint64),
+            "values": np.concatenate([normal_words, strikeout_words]).astype(np.uint64),
+            "strikeout": np.concatenate([np.zeros(normal_words.size, bool), np.ones(strikeout_words.size, bool)]),
+        }
+
+    words_16x32 = section_words(packed_16x32)
+    strikeout_16x32 = section_words(strikeout(chars_16x32, packed_16x32, 16, 32))
+    words_32x64 = section_words(packed_32x64)
+    strikeout_32x64 = section_words(strikeout(chars_32x64, packed_32x64, 32, 64))
+    return {
+        "16x32": source(words_16x32[..., 0], strikeout_16x32[..., 0]),
+        "32x64 High": source(words_32x64[..., 0], strikeout_32x64[..., 0]),
+        "32x64 Low": source(words_32x64[..., 1], strikeout_32x64[..., 1]),
+    }
+
+
+def mif_sources(mif_16x32_file, mif_32x64_high_file, mif_32x64_low_file):
+    """Reads the three sources from the MIF files `write_mif` produces."""
+    return {
+        "16x32": read_mif(mif_16x32_file),
+        "32x64 High": read_mif(mif_32x64_high_file),
+        "32x64 Low": read_mif(mif_32x64_low_file),
+    }
+
+
+def plan_layout(layout, sources):
+    """
+    Validates `layout` against `sources` and returns the placements as
+    [(section, byte offsets, values)], without building anything.
+
+    Raises ValueError for unknown names, regions that overlap each other or the
+    checksum, and sections whose words do not fit their region (unless the
+    section has overflow "clip", which drops them).
+    """
+    size = layout["size"]
+    checksum = layout.get("checksum", "none")
+    if checksum != "none" and checksum not in CHECKSUMS:
+        raise ValueError(f"Unknown checksum '{checksum}' (expected none or one of {', '.join(CHECKSUMS)})")
+    checksum_offset = layout.get("checksum_offset")
+    if checksum_offset is None:
+        checksum_offset = size - 2 if checksum != "none" else size
+    if not 0 <= checksum_offset <= size - (2 if checksum != "none" else 0):
+        raise ValueError(f"Checksum offset 0x{checksum_offset:X} is outside the {size}-byte image")
+    data_end = checksum_offset
+
+    placements = []
+    regions = []
+    previous_end = 0
+    for section in layout["sections"]:
+        name = section["source"]
+        if name not in sources:
+            raise ValueError(f"Layout needs source '{name}' (have {', '.join(sources)})")
+        if section["remap"] not in REMAPS:
+            raise ValueError(f"Unknown remap '{section['remap']}' (expected one of {', '.join(REMAPS)})")
+        source = sources[name]
+        if np.any(source["values"] > 0xFFFF):
+            raise ValueError(f"Source '{name}' has words wider than 16 bits")
+
+        base = previous_end if section["base"] == "follow" else section["base"]
+        end = section.get("end") or data_end
+        if not 0 <= base <= end <= size:
+            raise ValueError(f"Section '{name}' region 0x{base:X}..0x{end:X} is outside the {size}-byte image")
+        offsets = base + REMAPS[section["remap"]](source, section)
+        values = source["values"]
+        outside = (offsets < base) | (offsets + 2 > end)
+        if outside.any():
+            if section.get("overflow", "error") != "clip":
+                raise ValueError(f"Section '{name}' needs 0x{int(offsets.max()) + 2 - base:X} bytes, "
+                                 f"its region 0x{base:X}..0x{end:X} holds 0x{end - base:X}")
+            offsets, values = offsets[~outside], values[~outside]
+        # "follow" regions end where their data ends
+        if section["base"] == "follow" or section.get("end") is None:
+            end = int(offsets.max()) + 2 if offsets.size else base
+        regions.append((base, end, name))
+        placements.append((section, offsets, values))
+        previous_end = end
+
+    if checksum != "none":
+        regions.append((checksum_offset, checksum_offset + 2, "checksum"))
+    regions.sort()
+    for (start, end, name), (next_start, _, next_name) in zip(regions, regions[1:]):
+        if next_start < end:
+            raise ValueError(f"Region '{name}' (0x{start:X}..0x{end:X}) overlaps '{next_name}' at 0x{next_start:X}")
+    return placements, checksum_offset
+
+
+def assemble_layout(layout, sources):
+    """Validates and builds the image described by `layout`; returns (image bytes, checksum or None)."""
+    placements, checksum_offset = plan_layout(layout, sources)
+    image = np.full(layout["size"], layout.get("fill", 0x00), dtype=np.uint8)
+    for _, offsets, values in placements:
+        image[offsets] = (values >> np.uint64(8)).astype(np.uint8)
+        image[offsets + 1] = (values & np.uint64(0xFF)).astype(np.uint8)
+
+    checksum = None
+    if layout.get("checksum", "none") != "none":
+        function, byteorder = CHECKSUMS[layout["checksum"]]
+        checksum = function(image[:checksum_offset])
+        image[checksum_offset:checksum_offset + 2] = np.frombuffer(checksum.to_bytes(2, byteorder), dtype=np.uint8)
+    return image.tobytes(), checksum
+
+
+def write_layout_binary(layout, output_file, mif_16x32_file, mif_32x64_high_file, mif_32x64_low_file):
+    """
+    Replacement for the `write_combined_binary` copies: builds `layout` (a spec or
+    a LAYOUTS preset name) from the three MIF files, named by keyword so the
+    argument order is the same for every variant.
+    """
+    spec = LAYOUTS[layout] if isinstance(layout, str) else layout
+    image, checksum = assemble_layout(spec, mif_sources(mif_16x32_file, mif_32x64_high_file, mif_32x64_low_file))
+    with open(output_file, "wb") as bin_file:
+        bin_file.write(image)
+    name = layout if isinstance(layout, str) else "custom"
+    print(f"✅ Combined binary ({name} layout) written to {output_file}: {len(image)} bytes"
+          f"{'' if checksum is None else f', checksum 0x{checksum:04X}'}")
+    return image
@@ -0,0 +1,277 @@
+"""
+Character-to-slot lookup structures for sparse Unicode character sets.
+
+Glyph slots follow the insertion order of `all_xbm_data`, and `char_list` mixes
+ASCII with scattered code points (0x2026, 0x2190-0x2193, 0x21CC, 0x25BC, 0x2713).
+Instead of hand-maintained tables, the builder emits one of two lookup structures,
+with matching Python and C implementations:
+
+  - "sorted": code points in ascending order plus their slots (binary search)
+  - "mphf":   a minimal perfect hash (hash and displace): the code point's bucket
+              picks a seed, the seeded hash picks the entry, one compare confirms it
+
+Serialized layout (little-endian):
+  u8 kind (0 sorted, 1 mphf), u8 key bytes (2 or 4), u16 count, u16 bucket count,
+  bucket count u16 seeds (mphf only), count keys, count u8 slots
+"""
+import bisect
+import math
+import os
+import random
+import struct
+import time
+
+import numpy as np
+
+from Glyphs import glyph_order
+
+KIND_SORTED = 0
+KIND_MPHF = 1
+
+NOT_FOUND = 0xFF
+MASK32 = 0xFFFFFFFF
+
+
+def mix32(key, seed):
+    """32-bit integer hash (murmur3 finalizer) of a code point and a seed."""
+    x = (key ^ (seed * 0x9E3779B9)) & MASK32
+    x ^= x >> 16
+    x = (x * 0x85EBCA6B) & MASK32
+    x ^= x >> 13
+    x = (x * 0xC2B2AE35) & MASK32
+    x ^= x >> 16
+    return x
+
+
+def lookup_entries(chars, slots=None):
+    """
+    Returns [(code point, slot)]. Without `slots`, repeated characters collapse the
+    way they do in `all_xbm_data` (`glyph_order`, e.g. the space listed twice in
+    `char_list`); with explicit slots every character must appear once.
+    """
+    if slots is None:
+        chars = glyph_order(chars)
+        slots = range(len(chars))
+    else:
+        chars, slots = list(chars), list(slots)
+        if len(chars) != len(slots):
+            raise ValueError(f"{len(chars)} characters but {len(slots)} slots")
+        duplicates = [char for char in dict.fromkeys(chars) if chars.count(char) > 1]
+        if duplicates:
+            raise ValueError(f"Characters listed more than once: {', '.join(repr(char) for char in duplicates)}")
+    return [(ord(char), slot) for char, slot in zip(chars, slots)]
+
+
+def build_sorted_lookup(chars, slots=None):
+    """Builds the sorted table. `slots` defaults to the insertion order of `chars`."""
+    entries = sorted(lookup_entries(chars, slots))
+    return {
+        "kind": KIND_SORTED,
+        "keys": [key for key, _ in entries],
+        "slots": [slot for _, slot in entries],
+        "seeds": [],
+    }
+
+
+def build_mphf_lookup(chars, slots=None, max_seed=0xFFFF):
+    """Builds the minimal perfect hash. `slots` defaults to the insertion order of `chars`."""
+    entries = lookup_entries(chars, slots)
+    count = len(entries)
+    bucket_count = max(1, (count + 1) // 2)
+    buckets = [[] for _ in range(bucket_count)]
+    for key, slot in entries:
+        buckets[mix32(key, 0) % bucket_count].append((key, slot))
+
+    seeds = [0] * bucket_count
+    table_keys = [None] * count
+    table_slots = [NOT_FOUND] * count
+    for bucket in sorted(range(bucket_count), key=lambda b: -len(buckets[b])):
+        entries = buckets[bucket]
+        if not entries:
+            continue
+        for seed in range(1, max_seed + 1):
+            positions = [mix32(key, seed) % count for key, _ in entries]
+            if len(set(positions)) == len(positions) and all(table_keys[p] is None for p in positions):
+                break
+        else:
+            raise ValueError(f"No perfect hash seed found for bucket {bucket}")
+        seeds[bucket] = seed
+        for position, (key, slot) in zip(positions, entries):
+            table_keys[position] = key
+            table_slots[position] = slot
+    return {"kind": KIND_MPHF, "keys": table_keys, "slots": table_slots, "seeds": seeds}
+
+
+def lookup_sorted(lookup, code_point):
+    """Python reference lookup for the sorted table; returns NOT_FOUND when absent."""
+    keys = lookup["keys"]
+    i = bisect.bisect_left(keys, code_point)
+    return lookup["slots"][i] if i < len(keys) and keys[i] == code_point else NOT_FOUND
+
+
+def lookup_mphf(lookup, code_point):
+    """Python reference lookup for the minimal perfect hash; returns NOT_FOUND when absent."""
+    keys = lookup["keys"]
+    if not keys:
+        return NOT_FOUND
+    seed = lookup["seeds"][mix32(code_point, 0) % len(lookup["seeds"])]
+    position = mix32(code_point, seed) % len(keys)
+    return lookup["slots"][position] if keys[position] == code_point else NOT_FOUND
+
+
+def lookup_many(lookup, text):
+    """Vectorized lookup of a whole string (sorted tables only); returns a uint8 slot array."""
+    if lookup["kind"] != KIND_SORTED:
+        raise ValueError("lookup_many needs a sorted table")
+    keys = np.asarray(lookup["keys"], dtype=np.uint32)
+    slots = np.append(np.asarray(lookup["slots"], dtype=np.uint8), NOT_FOUND)
+    code_points = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    index = np.searchsorted(keys, code_points)
+    found = keys[np.minimum(index, len(keys) - 1)] == code_points if len(keys) else np.zeros(len(text), bool)
+    return slots[np.where(found, index, len(keys))]
+
+
+def serialize_lookup(lookup):
+    """Packs a lookup structure into the ROM layout described above."""
+    key_bytes = 2 if max(lookup["keys"], default=0) < 0x10000 else 4
+    key_format = "<H" if key_bytes == 2 else "<I"
+    data = bytearray(struct.pack("<BBHH", lookup["kind"], key_bytes, len(lookup["keys"]), len(lookup["seeds"])))
+    data += b"".join(struct.pack("<H", seed) for seed in lookup["seeds"])
+    data += b"".join(struct.pack(key_format, key) for key in lookup["keys"])
+    data += bytes(lookup["slots"])
+    return bytes(data)
+
+
+def write_lookup_header(lookup, output_file, symbol="font_lookup"):
+    """Writes the lookup arrays and a matching `<symbol>_find()` C function."""
+    prefix = symbol.upper()
+    key_type = "uint16_t" if max(lookup["keys"], default=0) < 0x10000 else "uint32_t"
+    guard = "".join(c if c.isalnum() else "_" for c in os.path.basename(output_file)).upper()
+
+    def c_array(c_type, name, values, per_line=12):
+        rows = [", ".join(f"0x{value:04X}" for value in values[i:i + per_line])
+                for i in range(0, len(values), per_line)]
+        return [f"static const {c_type} {name}[{max(len(values), 1)}] = {{"] + \
+               [f"    {row}," for row in rows] + ["};"]
+
+    lines = [
+        "/* Code point to glyph slot lookup, generated by Lookup.py */",
+        f"#ifndef {guard}",
+        f"#define {guard}",
+        "",
+        "#include <stdint.h>",
+        "",
+        f"#define {prefix}_COUNT {len(lookup['keys'])}u",
+        f"#define {prefix}_NOT_FOUND 0x{NOT_FOUND:02X}u",
+        "",
+    ]
+    lines += c_array(key_type, f"{symbol}_keys", lookup["keys"])
+    lines += c_array("uint8_t", f"{symbol}_slots", lookup["slots"])
+    lines.append("")
+
+    if not lookup["keys"]:
+        # Nothing to search, and the hash would take a position modulo a count of 0
+        lines += [
+            f"static inline uint8_t {symbol}_find(uint32_t code_point)",
+            "{",
+            "    (void)code_point;",
+            f"    return {prefix}_NOT_FOUND;",
+            "}",
+        ]
+    elif lookup["kind"] == KIND_MPHF:
+        lines += [f"#define {prefix}_BUCKETS {len(lookup['seeds'])}u"]
+        lines += c_array("uint16_t", f"{symbol}_seeds", lookup["seeds"])
+        lines += [
+            "",
+            f"static inline uint32_t {symbol}_mix32(uint32_t key, uint32_t seed)",
+            "{",
+            "    uint32_t x = key ^ (seed * 0x9E3779B9u);",
+            "    x ^= x >> 16;",
+            "    x *= 0x85EBCA6Bu;",
+            "    x ^= x >> 13;",
+            "    x *= 0xC2B2AE35u;",
+            "    x ^= x >> 16;",
+            "    return x;",
+            "}",
+            "",
+            f"static inline uint8_t {symbol}_find(uint32_t code_point)",
+            "{",
+            f"    uint16_t seed = {symbol}_seeds[{symbol}_mix32(code_point, 0) % {prefix}_BUCKETS];",
+            f"    uint32_t position = {symbol}_mix32(code_point, seed) % {prefix}_COUNT;",
+            f"    return {symbol}_keys[position] == code_point ? {symbol}_slots[position] : {prefix}_NOT_FOUND;",
+            "}",
+        ]
+    else:
+        lines += [
+            f"static inline uint8_t {symbol}_find(uint32_t code_point)",
+            "{",
+            f"    uint32_t low = 0, high = {prefix}_COUNT;",
+            "    while (low < high) {",
+            "        uint32_t mid = (low + high) / 2;",
+            f"        if ({symbol}_keys[mid] < code_point) low = mid + 1;",
+            "        else high = mid;",
+            "    }",
+            f"    return (low < {prefix}_COUNT && {symbol}_keys[low] == code_point) ? {symbol}_slots[low] : {prefix}_NOT_FOUND;",
+            "}",
+        ]
+    lines += ["", f"#endif /* {guard} */", ""]
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+    print(f"Lookup header saved as {output_file}")
+
+
+def write_lookup(chars, bin_file, header_file, kind="sorted", slots=None):
+    """
+    Builds the lookup for the glyph `chars` (the insertion order of `all_xbm_data`,
+    or explicit `slots` e.g. from a deduplicated ROM) and writes the ROM blob and C header.
+    """
+    builders = {"sorted": build_sorted_lookup, "mphf": build_mphf_lookup}
+    if kind not in builders:
+        raise ValueError(f"Unknown lookup kind '{kind}' (expected one of {', '.join(builders)})")
+    lookup = builders[kind](chars, slots)
+    data = serialize_lookup(lookup)
+    with open(bin_file, "wb") as f:
+        f.write(data)
+    print(f"✅ {kind} lookup for {len(lookup['keys'])} code points written to {bin_file} ({len(data)} bytes)")
+    write_lookup_header(lookup, header_file)
+    return lookup
+
+
+def benchmark_lookup(chars, lookups=200000):
+    """
+    Compares lookup cost for a dict, the sorted table (bisect and vectorized) and the
+    minimal perfect hash over random text drawn from `chars` plus some misses.
+    """
+    chars = glyph_order(chars)
+    sorted_lookup = build_sorted_lookup(chars)
+    mphf_lookup = build_mphf_lookup(chars)
+    by_dict = {ord(char): i for i, char in enumerate(chars)}
+    rng = random.Random(0)
+    sample = [ord(rng.choice(chars)) if rng.random() < 0.9 else rng.randrange(0x80, 0x3000) for _ in range(lookups)]
+    text = "".join(map(chr, sample))
+
+    timings = {}
+    for name, function in (("dict", lambda cp: by_dict.get(cp, NOT_FOUND)),
+                           ("sorted", lambda cp: lookup_sorted(sorted_lookup, cp)),
+                           ("mphf", lambda cp: lookup_mphf(mphf_lookup, cp))):
+        start = time.perf_counter()
+        results = [function(cp) for cp in sample]
+        timings[name] = (time.perf_counter() - start) / lookups
+        timings.setdefault("results", results)
+        if results != timings["results"]:
+            raise ValueError(f"{name} lookup disagrees with the dict")
+    start = time.perf_counter()
+    vectorized = lookup_many(sorted_lookup, text)
+    timings["sorted (vectorized)"] = (time.perf_counter() - start) / lookups
+    if vectorized.tolist() != timings.pop("results"):
+        raise ValueError("Vectorized lookup disagrees with the dict")
+
+    report = {f"{name} ns/lookup": seconds * 1e9 for name, seconds in timings.items()}
+    report["sorted probes"] = math.ceil(math.log2(len(chars) + 1))
+    report["mphf probes"] = 1
+    report["sorted bytes"] = len(serialize_lookup(sorted_lookup))
+    report["mphf bytes"] = len(serialize_lookup(mphf_lookup))
+    for name, value in report.items():
+        print(f"{name:<32} {value:10.1f}")
+    return report
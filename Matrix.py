@@ -0,0 +1,88 @@
+"""
+Build matrix: every combined-binary layout and checksum variant from one render.
+
+Hardware revisions expect different conventions (the 0x2000 strikeout remap of
+Okok.py/Sum.py, the contiguous remap of St.py, one's complement versus word sum
+versus byte sum, ...). Instead of re-running the converter per variant, the
+glyphs are rendered once, turned into sources once, and every requested
+layout/checksum combination is assembled from that shared in-memory data on a
+thread pool. Combinations that resolve to the same spec are built once.
+
+Each image is written as FontRomCombined_<layout>_<checksum>.bin next to a
+manifest.json listing its layout, checksum algorithm and value, size and CRC-32.
+"""
+import json
+import os
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from Glyphs import pack_glyphs
+from Layout import CHECKSUMS, LAYOUTS, assemble_layout, glyph_sources
+
+MANIFEST_FILE = "manifest.json"
+
+
+def matrix_specs(layouts=None, checksums=None):
+    """
+    Returns {(layout name, checksum name): spec} for the requested LAYOUTS presets
+    (all by default), each with its own checksum or with every name in `checksums`.
+    """
+    layouts = list(LAYOUTS) if layouts is None else list(layouts)
+    unknown = [name for name in layouts if name not in LAYOUTS]
+    unknown += [name for name in checksums or [] if name != "none" and name not in CHECKSUMS]
+    if unknown:
+        raise ValueError(f"Unknown layout(s) or checksum(s): {', '.join(unknown)}")
+    specs = {}
+    for layout in layouts:
+        for checksum in checksums or [LAYOUTS[layout].get("checksum", "none")]:
+            specs[layout, checksum] = {**LAYOUTS[layout], "checksum": checksum}
+    return specs
+
+
+def build_matrix(xbm_data_16x32, xbm_data_32x64, output_dir, layouts=None, checksums=None, workers=None):
+    """
+    Assembles and writes every layout/checksum combination for one render (the two
+    `generate_xbm_data` results) and writes the manifest. Returns the manifest.
+    """
+    start = time.perf_counter()
+    sources = glyph_sources(*pack_glyphs(xbm_data_16x32, 16, 32), *pack_glyphs(xbm_data_32x64, 32, 64))
+    specs = matrix_specs(layouts, checksums)
+
+    # Identical specs (Sum/Wellok, Bin/Binwrite2) are assembled once
+    unique = {}
+    for key, spec in specs.items():
+        unique.setdefault(json.dumps(spec, sort_keys=True), []).append(key)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {text: pool.submit(assemble_layout, specs[keys[0]], sources) for text, keys in unique.items()}
+        results = {key: futures[text].result() for text, keys in unique.items() for key in keys}
+
+    os.makedirs(output_dir, exist_ok=True)
+    images = []
+    for (layout, checksum), (image, value) in results.items():
+        file_name = f"FontRomCombined_{layout}_{checksum}.bin"
+        with open(os.path.join(output_dir, file_name), "wb") as bin_file:
+            bin_file.write(image)
+        images.append({
+            "file": file_name,
+            "layout": layout,
+            "checksum": checksum,
+            "checksum_value": None if value is None else f"0x{value:04X}",
+            "size": len(image),
+            "crc32": f"0x{zlib.crc32(image):08X}",
+        })
+
+    manifest = {
+        "glyphs_16x32": len(xbm_data_16x32),
+        "glyphs_32x64": len(xbm_data_32x64),
+        "images": images,
+    }
+    with open(os.path.join(output_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    seconds = time.perf_counter() - start
+    print(f"✅ {len(images)} combined binaries ({len(unique)} distinct layouts) written to {output_dir} "
+          f"in {seconds:.3f} s")
+    for entry in images:
+        print(f"  {entry['file']:<52} checksum {entry['checksum_value'] or '-':>6}  crc32 {entry['crc32']}")
+    return manifest
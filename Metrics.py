@@ -0,0 +1,132 @@
+"""
+Per-glyph bounding-box metrics for faster blitting on the device.
+
+Every glyph is stored as a full 16x32 or 32x64 cell although most rows are blank.
+The metrics table records where the ink actually is, so firmware can skip blank
+rows and columns when drawing. Metrics are taken from the packed bitmaps (after
+scaling, thresholding and canvas placement), vectorized across the whole glyph set.
+
+Record per glyph (4 bytes): first_row, last_row, ink_width, x_offset.
+Blank glyphs (e.g. space) have first_row = 0xFF and ink_width = 0.
+
+ROM section (placed at METRICS_BASE, right after the 80K combined image):
+  u8 glyph count 16x32, u8 glyph count 32x64, 16x32 records, 32x64 records,
+  followed by a little-endian 16-bit byte sum of the section.
+
+`append_metrics_section` places the section there: the combined image keeps its
+own checksum at 0x13FFE and the section follows it, so firmware that only knows
+the 80K layout is unaffected.
+"""
+import numpy as np
+
+from Glyphs import pack_glyphs
+from Rom import TARGET_SIZE, build_combined_image, byte_sum_checksum
+
+METRICS_BASE = TARGET_SIZE
+
+BLANK_ROW = 0xFF
+
+
+def compute_metrics(packed):
+    """
+    Returns a (glyphs, 4) uint8 array of first_row, last_row, ink_width, x_offset
+    for a packed glyph array.
+    """
+    pixels = np.unpackbits(packed, axis=-1, bitorder="little").astype(bool)
+    row_ink = pixels.any(axis=2)
+    col_ink = pixels.any(axis=1)
+    inked = row_ink.any(axis=1)
+
+    first_row = row_ink.argmax(axis=1)
+    last_row = row_ink.shape[1] - 1 - row_ink[:, ::-1].argmax(axis=1)
+    x_offset = col_ink.argmax(axis=1)
+    last_col = col_ink.shape[1] - 1 - col_ink[:, ::-1].argmax(axis=1)
+
+    metrics = np.stack([first_row, last_row, last_col - x_offset + 1, x_offset], axis=1)
+    metrics[~inked] = (BLANK_ROW, 0, 0, 0)
+    return metrics.astype(np.uint8)
+
+
+def build_metrics_section(metrics_16x32, metrics_32x64):
+    """Serializes both metrics tables into the ROM section described above."""
+    data = bytearray([len(metrics_16x32), len(metrics_32x64)])
+    data += metrics_16x32.tobytes()
+    data += metrics_32x64.tobytes()
+    data += byte_sum_checksum(data).to_bytes(2, "little")
+    return bytes(data)
+
+
+def append_metrics_section(image, section):
+    """Returns the combined ROM `image` with the metrics `section` at METRICS_BASE."""
+    if len(image) != METRICS_BASE:
+        raise ValueError(f"Combined image is {len(image)} bytes, the metrics section goes at "
+                         f"0x{METRICS_BASE:05X} right after an image of {METRICS_BASE} bytes")
+    return bytes(image) + section
+
+
+def _c_char_comment(char):
+    if char.isascii() and char.isprintable() and char not in "*/\\":
+        return f"'{char}'"
+    return f"U+{ord(char):04X}"
+
+
+def write_metrics_header(chars_16x32, metrics_16x32, chars_32x64, metrics_32x64, output_file):
+    """Writes both metrics tables as a C header."""
+    lines = [
+        "/* Glyph bounding-box metrics, generated by Metrics.py */",
+        "#ifndef FONT_METRICS_H",
+        "#define FONT_METRICS_H",
+        "",
+        "#include <stdint.h>",
+        "",
+        "typedef struct {",
+        "    uint8_t first_row;   /* first inked row, FONT_METRICS_BLANK if the glyph is empty */",
+        "    uint8_t last_row;    /* last inked row */",
+        "    uint8_t ink_width;   /* inked columns, 0 if the glyph is empty */",
+        "    uint8_t x_offset;    /* first inked column */",
+        "} glyph_metrics_t;",
+        "",
+        f"#define FONT_METRICS_BLANK 0x{BLANK_ROW:02X}",
+        f"#define FONT_METRICS_BASE 0x{METRICS_BASE:05X}",
+    ]
+    for name, chars, metrics in (("16X32", chars_16x32, metrics_16x32), ("32X64", chars_32x64, metrics_32x64)):
+        lines += [
+            "",
+            f"#define FONT_METRICS_{name}_COUNT {len(chars)}",
+            f"static const glyph_metrics_t font_metrics_{name.lower()}[FONT_METRICS_{name}_COUNT] = {{",
+        ]
+        lines += [f"    {{ {m[0]:3d}, {m[1]:3d}, {m[2]:3d}, {m[3]:3d} }}, /* {_c_char_comment(char)} */"
+                  for char, m in zip(chars, metrics)]
+        lines.append("};")
+    lines += ["", "#endif /* FONT_METRICS_H */", ""]
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+    print(f"Metrics header saved as {output_file}")
+
+
+def write_metrics(xbm_data_16x32, xbm_data_32x64, section_file, header_file, image_file=None):
+    """
+    Computes the metrics for both `generate_xbm_data` results and writes the ROM
+    section and the matching C header. With `image_file`, also writes the combined
+    ROM for the same glyphs with the section appended at METRICS_BASE.
+    """
+    chars_16x32, packed_16x32 = pack_glyphs(xbm_data_16x32, 16, 32)
+    chars_32x64, packed_32x64 = pack_glyphs(xbm_data_32x64, 32, 64)
+    metrics_16x32 = compute_metrics(packed_16x32)
+    metrics_32x64 = compute_metrics(packed_32x64)
+
+    section = build_metrics_section(metrics_16x32, metrics_32x64)
+    with open(section_file, "wb") as bin_file:
+        bin_file.write(section)
+    print(f"✅ Metrics section written to {section_file} ({len(section)} bytes, base 0x{METRICS_BASE:05X})")
+
+    if image_file is not None:
+        image = append_metrics_section(build_combined_image(chars_16x32, packed_16x32, chars_32x64, packed_32x64),
+                                       section)
+        with open(image_file, "wb") as bin_file:
+            bin_file.write(image)
+        print(f"✅ Combined ROM with metrics written to {image_file} ({len(image)} bytes)")
+
+    write_metrics_header(chars_16x32, metrics_16x32, chars_32x64, metrics_32x64, header_file)
+    return metrics_16x32, metrics_32x64
@@ -0,0 +1,287 @@
+"""
+MIF reader returning NumPy arrays.
+
+The `load_mif_data` / `load_mif_data_16x32` loaders inside the `write_combined_binary`
+versions read line by line, check every character against a hex string and only
+accept 4-digit words. `read_mif` memory-maps the file, reads the header with
+compiled regexes and parses the whole body as one NumPy byte array (comments
+blanked, whitespace dropped, entries split at `:` and `;`), converting all
+addresses and values at once:
+
+  - any WIDTH (values up to 64 bits as uint64, wider as Python ints)
+  - HEX, DEC/UNS, OCT and BIN radixes
+  - `addr : value;` and the range form `[first..last] : value;`
+  - `-- Strikeout Character` markers: entries after one are flagged as strikeout
+    until a plain `-- Character` marker (what `write_mif` emits)
+"""
+import mmap
+import os
+import re
+import tempfile
+import time
+
+import numpy as np
+
+HEADER_PATTERN = re.compile(rb"\b(DEPTH|WIDTH|ADDRESS_RADIX|DATA_RADIX)[ \t]*=[ \t]*(\w+)[ \t]*;", re.IGNORECASE)
+CONTENT_PATTERN = re.compile(rb"\bCONTENT\s+BEGIN\b", re.IGNORECASE)
+
+RADIX_BASES = {"HEX": 16, "DEC": 10, "UNS": 10, "OCT": 8, "BIN": 2}
+
+# ASCII code to digit value, 0xFF for anything that is not a digit
+_DIGITS = np.full(256, 0xFF, dtype=np.uint8)
+_DIGITS[np.frombuffer(b"0123456789", dtype=np.uint8)] = np.arange(10)
+_DIGITS[np.frombuffer(b"ABCDEF", dtype=np.uint8)] = np.arange(10, 16)
+_DIGITS[np.frombuffer(b"abcdef", dtype=np.uint8)] = np.arange(10, 16)
+_SPACE = np.zeros(256, dtype=bool)
+_SPACE[np.frombuffer(b" \t\r\n\f\v", dtype=np.uint8)] = True
+_WORD = _DIGITS != 0xFF
+_WORD[ord("_")] = True
+_WORD[np.frombuffer(b"GHIJKLMNOPQRSTUVWXYZghijklmnopqrstuvwxyz", dtype=np.uint8)] = True
+
+
+def parse_numbers(text, starts, ends, base=16, bits=64):
+    """
+    Converts the digit strings text[starts[i]:ends[i]] (text is a uint8 array) to a
+    uint64 array, or to an object array of Python ints when `bits` is over 64.
+    """
+    if bits > 64:
+        return np.array([int(text[start:end].tobytes(), base) for start, end in zip(starts, ends)], dtype=object)
+    values = np.zeros(len(starts), dtype=np.uint64)
+    if len(starts) == 0:
+        return values
+    lengths = ends - starts
+    if lengths.min() <= 0:
+        raise ValueError("Empty number in MIF")
+    # Right-aligned columns: positions before a number's first digit count as 0
+    for column in range(int(lengths.max()), 0, -1):
+        positions = ends - column
+        inside = positions >= starts
+        digits = np.where(inside, _DIGITS[text[np.maximum(positions, 0)]], 0)
+        if (digits >= base).any():
+            bad = int(np.argmax(digits >= base))
+            raise ValueError(f"Invalid base-{base} number "
+                             f"{text[starts[bad]:ends[bad]].tobytes().decode(errors='replace')!r} in MIF")
+        values = values * np.uint64(base) + digits.astype(np.uint64)
+    return values
+
+
+def _blank_comments(text):
+    """
+    Overwrites `--` line comments and `% ... %` block comments in `text` with spaces.
+    Returns (positions, strikeout) of the section markers (`-- ... Character` lines).
+    """
+    newlines = np.flatnonzero(text == ord("\n"))
+    dashes = np.flatnonzero((text[:-1] == ord("-")) & (text[1:] == ord("-")))
+    lines, first = np.unique(np.searchsorted(newlines, dashes), return_index=True)
+    starts = dashes[first]
+    ends = np.append(newlines, text.size)[lines]
+
+    marker_positions, marker_strikeout = [], []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        comment = text[start:end].tobytes().lower()
+        if b"strikeout" in comment or b"character" in comment:
+            marker_positions.append(start)
+            marker_strikeout.append(b"strikeout" in comment)
+
+    def blank(starts, ends):
+        lengths = ends - starts
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        text[np.repeat(starts, lengths) + offsets] = ord(" ")
+
+    blank(starts, ends)
+    percents = np.flatnonzero(text == ord("%"))
+    if percents.size % 2:
+        raise ValueError("Unterminated % comment in MIF")
+    blank(percents[0::2], percents[1::2] + 1)
+    return np.array(marker_positions, dtype=np.intp), np.array(marker_strikeout, dtype=bool)
+
+
+def parse_mif(data):
+    """
+    Parses MIF text (bytes, bytearray or mmap). Returns a dict with the header
+    fields and file-order `addresses`, `values` and boolean `strikeout` arrays;
+    range entries are expanded to one element per address.
+    """
+    content = CONTENT_PATTERN.search(data)
+    body_start = content.end() if content else 0
+    header = {key.upper().decode(): value.decode().upper()
+              for key, value in HEADER_PATTERN.findall(data, 0, body_start if content else len(data))}
+    width = int(header.get("WIDTH", 16))
+    address_base = RADIX_BASES[header.get("ADDRESS_RADIX", "HEX")]
+    data_base = RADIX_BASES[header.get("DATA_RADIX", "HEX")]
+
+    text = np.frombuffer(data, dtype=np.uint8)[body_start:].copy()
+    marker_positions, marker_strikeout = _blank_comments(text)
+
+    # Drop whitespace; `positions` maps the compact text back to the file
+    positions = np.flatnonzero(~_SPACE[text])
+    compact = text[positions]
+    word = _WORD[compact]
+    if ((np.diff(positions) > 1) & word[:-1] & word[1:]).any():
+        raise ValueError("MIF entries with several values per address are not supported")
+
+    # Every `;` ends a statement; statements with a `:` are entries (END; is not)
+    semicolons = np.flatnonzero(compact == ord(";"))
+    starts = np.append(0, semicolons[:-1] + 1)[:semicolons.size]
+    colons = np.flatnonzero(compact == ord(":"))
+    first_colon = np.searchsorted(colons, starts)
+    colon_count = np.searchsorted(colons, semicolons) - first_colon
+    if (colon_count > 1).any():
+        raise ValueError("Malformed MIF entry with more than one ':'")
+    is_entry = colon_count == 1
+    starts, ends = starts[is_entry], semicolons[is_entry]
+    colons = colons[first_colon[is_entry]]
+
+    values = parse_numbers(compact, colons + 1, ends, data_base, width)
+    is_range = compact[starts] == ord("[")
+    if is_range.any():
+        # [first..last]: the address is the first, expanded below
+        dots = np.array([compact[start:colon].tobytes().find(b"..") for start, colon in
+                         zip(starts[is_range].tolist(), colons[is_range].tolist())], dtype=np.intp)
+        if (dots < 0).any() or (compact[colons[is_range] - 1] != ord("]")).any():
+            raise ValueError("Malformed MIF range address")
+        address_starts, address_ends = starts.copy(), colons.copy()
+        address_starts[is_range] += 1
+        address_ends[is_range] = starts[is_range] + dots
+        addresses = parse_numbers(compact, address_starts, address_ends, address_base)
+        last = addresses.copy()
+        last[is_range] = parse_numbers(compact, starts[is_range] + dots + 2, colons[is_range] - 1, address_base)
+        if (last < addresses).any():
+            raise ValueError("MIF range with last address before first")
+        counts = (last - addresses + np.uint64(1)).astype(np.intp)
+        entry = np.repeat(np.arange(len(counts)), counts)
+        offsets = np.arange(entry.size) - np.repeat(np.cumsum(counts) - counts, counts)
+        addresses = addresses[entry] + offsets.astype(np.uint64)
+        values = values[entry]
+    else:
+        entry = slice(None)
+        addresses = parse_numbers(compact, starts, colons, address_base)
+
+    # Entries take the mode of the last section marker before them (normal before the first)
+    marker = np.searchsorted(marker_positions, positions[ends])
+    strikeout = np.append(False, marker_strikeout)[marker][entry]
+
+    return {
+        "depth": int(header["DEPTH"]) if "DEPTH" in header else None,
+        "width": width,
+        "address_radix": header.get("ADDRESS_RADIX", "HEX"),
+        "data_radix": header.get("DATA_RADIX", "HEX"),
+        "addresses": addresses,
+        "values": values,
+        "strikeout": strikeout,
+    }
+
+
+def read_mif(file_path):
+    """Memory-maps and parses a MIF file, see `parse_mif`."""
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return parse_mif(b"")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return parse_mif(data)
+
+
+def mif_words(mif, depth=None, fill=0):
+    """
+    Returns the MIF contents as a dense array indexed by address (later entries win,
+    like Quartus). `depth` defaults to the header DEPTH, extended to the highest
+    address + 1: `write_mif`'s 16x32 file (DEPTH = 8192) has its strikeout glyphs
+    from 0x2000. An explicit `depth` that entries do not fit in raises ValueError.
+    """
+    addresses = mif["addresses"].astype(np.intp)
+    extent = int(addresses.max(initial=-1)) + 1
+    if depth is None:
+        depth = max(mif["depth"] or 0, extent)
+    elif extent > depth:
+        outside = addresses[addresses >= depth]
+        raise ValueError(f"{outside.size} entries at 0x{int(outside.min()):X}..0x{int(outside.max()):X} "
+                         f"are outside depth {depth}")
+    dtype = object if mif["width"] > 64 else np.min_scalar_type((1 << mif["width"]) - 1)
+    words = np.full(depth, fill, dtype=dtype)
+    words[addresses] = mif["values"].astype(dtype)
+    return words
+
+
+def mif_sections(mif):
+    """Splits the values into (normal, strikeout) arrays, in file order."""
+    return mif["values"][~mif["strikeout"]], mif["values"][mif["strikeout"]]
+
+
+def _legacy_load_mif_data_16x32(file_path):
+    """The line-by-line loader from `write_combined_binary`, kept for benchmarking."""
+    entries = []
+    mode = "normal"
+    normal_count = 0
+    strikeout_count = 0
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("--"):
+                if "strikeout" in line.lower():
+                    mode = "strikeout"
+                continue
+            if ":" not in line or not line.endswith(";"):
+                continue
+            parts = line.split(":")
+            data_str = parts[1].split(";")[0].strip()
+            if len(data_str) == 4 and all(c in "0123456789ABCDEFabcdef" for c in data_str):
+                if mode == "normal":
+                    entries.append(("normal", normal_count, data_str))
+                    normal_count += 1
+                else:
+                    entries.append(("strikeout", strikeout_count, data_str))
+                    strikeout_count += 1
+    return entries
+
+
+def benchmark_mif_parser(file_path=None, glyphs=32768, rows=32, legacy_loader=_legacy_load_mif_data_16x32):
+    """
+    Times `read_mif` against a legacy loader on `file_path`, or on a generated MIF
+    in the `write_mif` format with `glyphs` normal and strikeout glyphs, and checks
+    that both return the same words.
+    """
+    temporary = None
+    if file_path is None:
+        rng = np.random.default_rng(0)
+        words = rng.integers(0, 0x10000, size=glyphs * rows * 2)
+        fd, temporary = tempfile.mkstemp(suffix=".mif")
+        with os.fdopen(fd, "w") as f:
+            f.write(f"DEPTH = {words.size};\nWIDTH = 16;\nADDRESS_RADIX = HEX;\nDATA_RADIX = HEX;\nCONTENT BEGIN\n\n")
+            for glyph in range(glyphs * 2):
+                kind = "Strikeout Character" if glyph >= glyphs else "Character"
+                f.write(f"-- {kind}: 'g{glyph}'\n")
+                base = glyph * rows
+                f.write("".join(f"{base + row:04X} : {words[base + row]:04X};\n" for row in range(rows)))
+                f.write("\n")
+            f.write("END;\n")
+        file_path = temporary
+
+    try:
+        start = time.perf_counter()
+        legacy = legacy_loader(file_path)
+        legacy_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        mif = read_mif(file_path)
+        fast_seconds = time.perf_counter() - start
+        size = os.path.getsize(file_path)
+    finally:
+        if temporary:
+            os.remove(temporary)
+
+    legacy_words = [int(entry[-1], 16) for entry in legacy]
+    legacy_strikeout = [entry[0] == "strikeout" for entry in legacy if len(entry) == 3]
+    if mif["values"].tolist() != legacy_words or \
+            (legacy_strikeout and mif["strikeout"].tolist() != legacy_strikeout):
+        raise ValueError("read_mif disagrees with the legacy loader")
+
+    report = {
+        "bytes": size,
+        "entries": int(mif["values"].size),
+        "legacy seconds": legacy_seconds,
+        "read_mif seconds": fast_seconds,
+        "speedup": legacy_seconds / fast_seconds,
+    }
+    print(f"✅ {report['entries']} entries ({size / 1e6:.1f} MB): legacy {legacy_seconds:.3f} s, "
+          f"read_mif {fast_seconds:.3f} s ({report['speedup']:.1f}x)")
+    return report
@@ -0,0 +1,212 @@
+"""
+Single-pass MIF writer.
+
+`write_mif` formats every word to hex up to three times (main file, then again
+for the Low and High split files) and keeps every line in `mif_output`. This
+writer formats the packed rows of each section once, as a NumPy ASCII matrix, and
+fans that out to all outputs in one traversal of the glyphs, with buffered writes.
+The files are byte-identical to `write_mif`'s, line endings included: `write_mif`
+writes in text mode, so they come out as os.linesep (CRLF on Windows):
+
+  - FontRom64.mif / FontRom32.mif: every row, strikeout glyphs from 0x2000
+    (for 16x32 that is past DEPTH = 8192, as in `write_mif`; the loaders read
+    the entries in order)
+  - FontRom16x64_High.mif / FontRom16x64_Low.mif (32x64 only): the first and
+    second 16-bit word of every row, next to the main file
+
+Nothing is accumulated unless a `mif_output` list is passed (kept for callers of
+the legacy signature); `iter_mif_lines` yields the lines of one output lazily.
+
+`compress_ranges` collapses runs of identical rows within a glyph (the blank rows
+above and below every character, the strikeout band) into the standard
+`[first..last] : value;` range syntax, keeping the character comments.
+"""
+import os
+
+import numpy as np
+
+from Glyphs import pack_glyphs
+from Variants import strikeout
+
+STRIKEOUT_ADDRESS = 0x2000
+WRITE_BUFFER_SIZE = 1 << 20
+LINE_ENDING = os.linesep.encode("ascii")
+
+_HEX_DIGITS = np.frombuffer(b"0123456789ABCDEF", dtype=np.uint8)
+
+
+def hex_matrix(values, digits):
+    """Formats integers as fixed-width uppercase hex, returns a (len, digits) ASCII matrix."""
+    shifts = 4 * np.arange(digits - 1, -1, -1, dtype=np.uint64)
+    return _HEX_DIGITS[(np.asarray(values, dtype=np.uint64)[:, None] >> shifts) & np.uint64(0xF)]
+
+
+def row_hex(packed):
+    """Formats every packed row once: returns a (glyphs * rows, row bytes * 2) ASCII matrix."""
+    glyphs, rows, row_bytes = packed.shape
+    nibbles = np.stack([packed >> 4, packed & 0x0F], axis=-1)
+    return _HEX_DIGITS[nibbles].reshape(glyphs * rows, row_bytes * 2)
+
+
+def repeat_text(text, count):
+    """`text` as a (count, len(text)) ASCII matrix, for building lines column-wise."""
+    return np.broadcast_to(np.frombuffer(text, dtype=np.uint8), (count, len(text)))
+
+
+def format_entries(address_hex, value_hex, rows, compress_ranges=False):
+    """
+    Builds the entry lines of a section, `rows` rows per glyph. Returns the bytes
+    and the byte offset of every glyph's first line (plus the end).
+
+    With `compress_ranges`, runs of identical values within a glyph become one
+    `[first..last] : value;` line.
+    """
+    count = address_hex.shape[0]
+    if not compress_ranges:
+        lines = np.concatenate([address_hex, repeat_text(b" : ", count), value_hex, repeat_text(b";\n", count)], axis=1)
+        return lines.tobytes(), np.arange(0, count + 1, rows) * lines.shape[1]
+
+    position = np.arange(count)
+    starts = np.flatnonzero((position % rows == 0) | np.append(True, (value_hex[1:] != value_hex[:-1]).any(axis=1)))
+    ends = np.append(starts[1:], count) - 1
+    run_count = starts.size
+    single = np.concatenate([address_hex[starts], repeat_text(b" : ", run_count), value_hex[starts],
+                             repeat_text(b";\n", run_count)], axis=1)
+    ranged = np.concatenate([repeat_text(b"[", run_count), address_hex[starts], repeat_text(b"..", run_count),
+                             address_hex[ends], repeat_text(b"] : ", run_count), value_hex[starts],
+                             repeat_text(b";\n", run_count)], axis=1)
+    # Left-align single lines in the wider range layout and drop the padding
+    is_range = ends > starts
+    lines = np.zeros_like(ranged)
+    lines[is_range] = ranged[is_range]
+    lines[~is_range, :single.shape[1]] = single[~is_range]
+    lengths = np.where(is_range, ranged.shape[1], single.shape[1])
+    data = lines[np.arange(ranged.shape[1]) < lengths[:, None]].tobytes()
+    glyph_lengths = np.bincount(starts // rows, weights=lengths, minlength=count // rows).astype(np.int64)
+    return data, np.append(0, np.cumsum(glyph_lengths))
+
+
+def native_newlines(chunk):
+    """Translates "\n" to os.linesep, like a text-mode write."""
+    return chunk if LINE_ENDING == b"\n" else chunk.replace(b"\n", LINE_ENDING)
+
+
+def mif_targets(output_file, canvas_width, canvas_height):
+    """
+    Describes the files `write_mif` produces for a canvas size: name, path, WIDTH,
+    DEPTH, the hex columns of each row it holds and how the file ends.
+    """
+    depth = 8192 if canvas_width == 16 and canvas_height == 32 else 16384
+    targets = [{"name": "combined", "path": output_file, "width": canvas_width, "depth": depth,
+                "columns": slice(None), "end": b"END;\n"}]
+    if canvas_width == 32 and canvas_height == 64:
+        output_dir = os.path.dirname(output_file)
+        # The split files are written without a trailing newline, as `write_mif` does
+        targets.append({"name": "low", "path": os.path.join(output_dir, "FontRom16x64_Low.mif"), "width": 16,
+                        "depth": 16384, "columns": slice(4, 8), "end": b"END;"})
+        targets.append({"name": "high", "path": os.path.join(output_dir, "FontRom16x64_High.mif"), "width": 16,
+                        "depth": 16384, "columns": slice(0, 4), "end": b"END;"})
+    return targets
+
+
+def mif_sections(chars, packed, canvas_width, canvas_height):
+    """[(comment label, first address, packed glyphs)] in file order."""
+    return [
+        ("Character", 0, packed),
+        ("Strikeout Character", STRIKEOUT_ADDRESS, strikeout(chars, packed, canvas_width, canvas_height)),
+    ]
+
+
+def mif_chunks(chars, packed, canvas_width, canvas_height, targets, compress_ranges=False):
+    """
+    Yields (target name, bytes) in file order for every target. Each section's rows
+    and addresses are formatted once and sliced per target.
+    """
+    rows = packed.shape[1]
+    for target in targets:
+        yield target["name"], (f"DEPTH = {target['depth']};\nWIDTH = {target['width']};\n"
+                               f"ADDRESS_RADIX = HEX;\nDATA_RADIX = HEX;\nCONTENT BEGIN\n\n").encode("ascii")
+
+    for label, base_address, glyphs in mif_sections(chars, packed, canvas_width, canvas_height):
+        values = row_hex(glyphs)
+        addresses = base_address + np.arange(values.shape[0])
+        address_hex = hex_matrix(addresses, max(4, len(f"{int(addresses.max(initial=0)):X}")))
+        blocks = []
+        for target in targets:
+            lines, offsets = format_entries(address_hex, values[:, target["columns"]], rows, compress_ranges)
+            blocks.append((target["name"], lines, offsets.tolist()))
+        for i, char in enumerate(chars):
+            comment = f"-- {label}: '{char}'\n".encode("utf-8")
+            for name, lines, offsets in blocks:
+                yield name, comment + lines[offsets[i]:offsets[i + 1]]
+
+    for target in targets:
+        yield target["name"], target["end"]
+
+
+def iter_mif_lines(all_xbm_data, canvas_width, canvas_height, target="combined", compress_ranges=False):
+    """Yields the lines (without newlines) of one `write_mif` output without writing files."""
+    chars, packed = pack_glyphs(all_xbm_data, canvas_width, canvas_height)
+    targets = [t for t in mif_targets("", canvas_width, canvas_height) if t["name"] == target]
+    if not targets:
+        raise ValueError(f"No '{target}' MIF output for {canvas_width}x{canvas_height}")
+    for _, chunk in mif_chunks(chars, packed, canvas_width, canvas_height, targets, compress_ranges):
+        yield from chunk.decode("utf-8").splitlines()
+
+
+def legacy_output_lines(name, chunks):
+    """
+    The entries `write_mif` adds to `mif_output` for one target's chunks: every
+    line of the main file with its "\n" (the header ends in "CONTENT BEGIN\n\n"),
+    then the split files' lines after their header, without newlines.
+    """
+    header, body = chunks[0].decode("utf-8"), b"".join(chunks[1:]).decode("utf-8")
+    if name != "combined":
+        return body.splitlines()
+    lines = [line + "\n" for line in header.rstrip("\n").split("\n")]
+    lines[-1] += "\n"
+    return lines + body.splitlines(keepends=True)
+
+
+def write_mif(all_xbm_data, output_file, canvas_width, canvas_height, mif_output=None, compress_ranges=False):
+    """
+    Writes the same MIF files as `write_mif` (normal and strikeout glyphs, plus the
+    Low and High split files for 32x64) in a single pass. As in `write_mif`, the
+    lines of the main file (with "\n") are appended to `mif_output` if it is given.
+
+    With `compress_ranges`, runs of identical rows within each glyph are written as
+    `[first..last] : value;` (the character comments stay) and the size reduction
+    against the plain files is reported. Returns {target name: (plain bytes, written bytes)}.
+    """
+    chars, packed = pack_glyphs(all_xbm_data, canvas_width, canvas_height)
+    targets = mif_targets(output_file, canvas_width, canvas_height)
+    files = {target["name"]: open(target["path"], "wb", buffering=WRITE_BUFFER_SIZE) for target in targets}
+    collected = {target["name"]: [] for target in targets}
+    try:
+        for name, chunk in mif_chunks(chars, packed, canvas_width, canvas_height, targets, compress_ranges):
+            files[name].write(native_newlines(chunk))
+            if mif_output is not None:
+                collected[name].append(chunk)
+    finally:
+        for f in files.values():
+            f.close()
+
+    if mif_output is not None:
+        for target in targets:
+            mif_output.extend(legacy_output_lines(target["name"], collected[target["name"]]))
+
+    print(f"MIF file saved as {output_file}")
+    for target in targets[1:]:
+        print(f"{target['name'].capitalize()} split MIF saved: {target['path']}")
+
+    sizes = {}
+    for target in targets:
+        written = os.path.getsize(target["path"])
+        plain = written
+        if compress_ranges:
+            plain = sum(len(native_newlines(chunk))
+                        for _, chunk in mif_chunks(chars, packed, canvas_width, canvas_height, [target]))
+            print(f"✅ {os.path.basename(target['path'])}: {written} bytes instead of {plain} "
+                  f"({1 - written / plain:.1%} smaller)")
+        sizes[target["name"]] = (plain, written)
+    return sizes
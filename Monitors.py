@@ -0,0 +1,240 @@
+"""
+Concurrent controller for racks of ecount monitors, built on asyncio.
+
+`handle_button_press` in Input.c switches one monitor between HDMI and DP and then
+polls `ecount_get_version` three times in a row to see whether the switch happened.
+Driving dozens of monitors that way from a host script is slow, so this controller
+keeps one reader per serial port, talks to every node at the same time and confirms
+input switches from the status frames as they arrive instead of fixed polling.
+
+A device is a (port path, node) pair; several nodes may share one port.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+
+from Ecount import (ADJ_INPUT_SELECT, CMD_GET_FIRMWARE_VERSION, CMD_SET_ADJUSTER, DEFAULT_TIMEOUT, DP_INPUT,
+                    ECOUNT_NODE, HDMI_INPUT, INPUT_NOT_SWITCHED, INPUT_TYPE_INDEX, EcountEmulator, FrameParser,
+                    build_packet, open_serial)
+
+# Status frames kept per node for waiters that register late
+STATUS_LOG_SIZE = 16
+
+
+class EcountPort:
+    """
+    One serial port shared by all nodes on it.
+
+    Status frames (version answers and unsolicited version frames) are numbered
+    per node and the last STATUS_LOG_SIZE are kept, so a waiter that registers
+    after a frame arrived still sees it: `request_marked` returns the number of
+    status frames seen when the answer came in, and `next_status(node, after)`
+    resolves with the first frame numbered above it.
+    """
+
+    def __init__(self, path, baudrate=115200):
+        self.path = path
+        self.baudrate = baudrate
+        self.fd = None
+        self.parser = FrameParser()
+        self.pending = {}
+        self.status_waiters = {}
+        self.status_counts = {}
+        self.status_log = {}
+        self.input_types = {}
+        self.write_lock = None
+
+    def open(self):
+        self.fd = open_serial(self.path, self.baudrate)
+        self.write_lock = asyncio.Lock()
+        asyncio.get_running_loop().add_reader(self.fd, self._on_readable)
+
+    def close(self):
+        asyncio.get_running_loop().remove_reader(self.fd)
+        os.close(self.fd)
+
+    def _on_readable(self):
+        try:
+            chunk = os.read(self.fd, 4096)
+        except BlockingIOError:
+            return
+        for node, command, data in self.parser.feed(chunk):
+            if command == CMD_GET_FIRMWARE_VERSION:
+                self._on_status(node, data[INPUT_TYPE_INDEX - 4])
+            waiters = self.pending.get((node, command))
+            while waiters:
+                future = waiters.pop(0)
+                if not future.done():
+                    future.set_result((data, self.status_counts.get(node, 0)))
+                    break
+
+    def _on_status(self, node, input_type):
+        self.input_types[node] = input_type
+        number = self.status_counts[node] = self.status_counts.get(node, 0) + 1
+        self.status_log.setdefault(node, deque(maxlen=STATUS_LOG_SIZE)).append((number, input_type))
+        for future in self.status_waiters.pop(node, []):
+            if not future.done():
+                future.set_result((number, input_type))
+
+    async def write(self, data):
+        """Writes `data` without blocking the event loop; concurrent writes do not interleave."""
+        loop = asyncio.get_running_loop()
+        async with self.write_lock:
+            view = memoryview(data)
+            while view:
+                try:
+                    view = view[os.write(self.fd, view):]
+                except BlockingIOError:
+                    writable = loop.create_future()
+                    loop.add_writer(self.fd, writable.set_result, None)
+                    try:
+                        await writable
+                    finally:
+                        loop.remove_writer(self.fd)
+
+    async def request_marked(self, node, command, data=b"", timeout=DEFAULT_TIMEOUT):
+        """
+        Sends a request and waits for the matching answer; answers arrive in order.
+        Returns (answer data, number of status frames from `node` up to the answer).
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.pending.setdefault((node, command), []).append(future)
+        await self.write(build_packet(node, command, data))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"No ecount response from {self.path} node 0x{node:02X}") from None
+
+    async def request(self, node, command, data=b"", timeout=DEFAULT_TIMEOUT):
+        """Sends a request and returns the answer data."""
+        answer, _ = await self.request_marked(node, command, data, timeout)
+        return answer
+
+    def next_status(self, node, after=None):
+        """
+        Future resolved with (number, input type) of the first version frame from
+        `node`, answered or unsolicited, numbered above `after` (the next one by
+        default). Resolves at once when that frame has already arrived.
+        """
+        future = asyncio.get_running_loop().create_future()
+        after = self.status_counts.get(node, 0) if after is None else after
+        for number, input_type in self.status_log.get(node, ()):
+            if number > after:
+                future.set_result((number, input_type))
+                return future
+        self.status_waiters.setdefault(node, []).append(future)
+        return future
+
+
+class MonitorController:
+    """
+    Talks to many ecount nodes at once. `devices` is a list of (port path, node)
+    pairs (a bare path means ECOUNT_NODE); `timeout` applies per device and request.
+    """
+
+    def __init__(self, devices, timeout=DEFAULT_TIMEOUT, switch_timeout=1.0, baudrate=115200):
+        self.devices = [device if isinstance(device, tuple) else (device, ECOUNT_NODE) for device in devices]
+        self.timeout = timeout
+        self.switch_timeout = switch_timeout
+        self.ports = {path: EcountPort(path, baudrate) for path, _ in self.devices}
+        self.current_input = {device: HDMI_INPUT for device in self.devices}
+
+    async def __aenter__(self):
+        for port in self.ports.values():
+            port.open()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        for port in self.ports.values():
+            port.close()
+
+    async def get_version(self, device):
+        path, node = device
+        data = await self.ports[path].request(node, CMD_GET_FIRMWARE_VERSION, timeout=self.timeout)
+        return data[INPUT_TYPE_INDEX - 4]
+
+    async def set_adjuster(self, device, adjuster, value):
+        path, node = device
+        return await self.ports[path].request(node, CMD_SET_ADJUSTER, bytes([adjuster, value]), timeout=self.timeout)
+
+    async def switch_input(self, device, new_input):
+        """
+        Selects `new_input` and waits for a status frame that is not
+        INPUT_NOT_SWITCHED (the check `handle_button_press` uses). One version
+        request is sent right away; after that the node's own status frame
+        confirms the switch. Only frames that arrive after the select answer
+        count, including ones that came in before this coroutine resumed.
+        Returns True when confirmed within `switch_timeout`.
+        """
+        path, node = device
+        port = self.ports[path]
+        _, after = await port.request_marked(node, CMD_SET_ADJUSTER, bytes([ADJ_INPUT_SELECT, new_input]),
+                                             timeout=self.timeout)
+        deadline = time.monotonic() + self.switch_timeout
+        await port.request(node, CMD_GET_FIRMWARE_VERSION, timeout=self.timeout)
+        while True:
+            try:
+                after, input_type = await asyncio.wait_for(port.next_status(node, after),
+                                                           max(deadline - time.monotonic(), 0))
+            except asyncio.TimeoutError:
+                return False
+            if input_type != INPUT_NOT_SWITCHED:
+                self.current_input[device] = new_input
+                return True
+
+    async def toggle_input(self, device):
+        """Host-side `handle_button_press`: switches between HDMI and DP."""
+        new_input = DP_INPUT if self.current_input[device] == HDMI_INPUT else HDMI_INPUT
+        return await self.switch_input(device, new_input)
+
+    async def _for_all(self, action, devices=None):
+        devices = self.devices if devices is None else devices
+        results = await asyncio.gather(*(action(device) for device in devices), return_exceptions=True)
+        return dict(zip(devices, results))
+
+    async def get_versions(self, devices=None):
+        """Input type per device; failed devices map to their exception."""
+        return await self._for_all(self.get_version, devices)
+
+    async def toggle_inputs(self, devices=None):
+        """Toggles every device concurrently; maps each device to True/False or its exception."""
+        return await self._for_all(self.toggle_input, devices)
+
+
+def benchmark_controller(count=24, latency=0.002, switch_delay=0.05):
+    """
+    Toggles `count` emulated monitors one after another and then all at once, and
+    reports the time for each.
+    """
+    emulators = [EcountEmulator(latency=latency, switch_delay=switch_delay).start() for _ in range(count)]
+    try:
+        async def run():
+            async with MonitorController([emulator.port_name for emulator in emulators]) as controller:
+                start = time.perf_counter()
+                for device in controller.devices:
+                    await controller.toggle_input(device)
+                serial = time.perf_counter() - start
+
+                start = time.perf_counter()
+                results = await controller.toggle_inputs()
+                concurrent = time.perf_counter() - start
+                versions = await controller.get_versions()
+            return serial, concurrent, results, versions
+
+        serial, concurrent, results, versions = asyncio.run(run())
+    finally:
+        for emulator in emulators:
+            emulator.stop()
+
+    confirmed = sum(result is True for result in results.values())
+    report = {
+        "devices": count,
+        "serial seconds": serial,
+        "concurrent seconds": concurrent,
+        "confirmed": confirmed,
+        "back on HDMI": sum(version == HDMI_INPUT for version in versions.values()),
+    }
+    print(f"{count} monitors: {serial:.3f} s one by one, {concurrent:.3f} s concurrently "
+          f"({confirmed}/{count} switches confirmed)")
+    return report
@@ -0,0 +1,162 @@
+"""
+Host-side display emulator: renders text from a combined ROM image into a NumPy
+framebuffer, so fonts and UI strings can be checked without flashing hardware.
+
+Glyphs are read back with `banks_from_combined_image` (the 32x64 High and Low
+words are recombined there) and unpacked once into (glyphs, rows, columns) pixel
+arrays. A text run is then a single fancy-indexing gather, and drawing a line is
+one slice assignment into the framebuffer. Runs are cached by (text, size, style).
+
+Framebuffer pixels are uint8 0/1, shape (height, width).
+"""
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from Glyphs import DEFAULT_CHAR_LIST, glyph_order
+from Lookup import NOT_FOUND, build_sorted_lookup, lookup_many
+from Rom import banks_from_combined_image
+
+SIZES = {"16x32": (16, 32), "32x64": (32, 64)}
+STYLES = ("normal", "strikeout")
+DEFAULT_RESOLUTION = (640, 480)
+RUN_CACHE_SIZE = 4096
+
+
+class FontRenderer:
+    """
+    Renders strings with the glyphs of a combined ROM image. `image` is the image
+    bytes or a path to FontRomCombined.bin; `chars` is the char list the ROM was
+    built from (slots follow `glyph_order(chars)`) and defaults to
+    DEFAULT_CHAR_LIST. Characters missing from the ROM render as `missing_char`
+    (blank if that is missing too).
+    """
+
+    def __init__(self, image, chars=None, missing_char="?", cache_size=RUN_CACHE_SIZE):
+        if isinstance(image, str):
+            with open(image, "rb") as f:
+                image = f.read()
+        self.chars = glyph_order(DEFAULT_CHAR_LIST if chars is None else chars)
+        banks = banks_from_combined_image(image, len(self.chars), len(self.chars))
+        self.glyphs = {}
+        for size in SIZES:
+            for style in STYLES:
+                packed = banks[f"{size} {style.capitalize()}"]
+                pixels = np.unpackbits(packed, axis=2, bitorder="little")
+                # One extra all-zero slot for characters that have no glyph
+                blank = np.zeros((1,) + pixels.shape[1:], dtype=np.uint8)
+                self.glyphs[size, style] = np.concatenate([pixels, blank])
+        self.lookup = build_sorted_lookup(self.chars)
+        self.missing_slot = self.chars.index(missing_char) if missing_char in self.chars else len(self.chars)
+        self.cache_size = cache_size
+        self.runs = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def slots(self, text):
+        """ROM slots for `text`; unknown characters map to the missing-character slot."""
+        slots = lookup_many(self.lookup, text).astype(np.intp)
+        slots[slots == NOT_FOUND] = self.missing_slot
+        return slots
+
+    def missing(self, text):
+        """Characters of `text` that have no glyph in the ROM."""
+        return sorted({char for char, slot in zip(text, lookup_many(self.lookup, text)) if slot == NOT_FOUND})
+
+    def render_run(self, text, size="16x32", style="normal"):
+        """Returns the pixels of `text` as one (rows, len(text) * canvas width) strip."""
+        if size not in SIZES or style not in STYLES:
+            raise ValueError(f"Unknown glyph set '{size} {style}'")
+        key = (text, size, style)
+        run = self.runs.get(key)
+        if run is not None:
+            self.runs.move_to_end(key)
+            self.cache_hits += 1
+            return run
+        self.cache_misses += 1
+
+        glyphs = self.glyphs[size, style][self.slots(text)]
+        count, rows, columns = glyphs.shape
+        run = glyphs.transpose(1, 0, 2).reshape(rows, count * columns)
+        run.flags.writeable = False
+        self.runs[key] = run
+        if len(self.runs) > self.cache_size:
+            self.runs.popitem(last=False)
+        return run
+
+    def draw_text(self, framebuffer, text, x, y, size="16x32", style="normal"):
+        """Draws `text` with its top-left corner at (x, y), clipped to the framebuffer."""
+        run = self.render_run(text, size, style)
+        height, width = framebuffer.shape
+        top, left = max(y, 0), max(x, 0)
+        bottom, right = min(y + run.shape[0], height), min(x + run.shape[1], width)
+        if top < bottom and left < right:
+            framebuffer[top:bottom, left:right] = run[top - y:bottom - y, left - x:right - x]
+        return framebuffer
+
+    def render_screen(self, lines, resolution=DEFAULT_RESOLUTION, size="16x32", style="normal", framebuffer=None):
+        """
+        Lays out `lines` top to bottom, one glyph cell per character, and returns the
+        framebuffer. Each line is a string or an (x, y, text) tuple placed explicitly.
+        Text past the right or bottom edge is clipped, as on the display.
+        """
+        width, height = resolution
+        if framebuffer is None:
+            framebuffer = np.zeros((height, width), dtype=np.uint8)
+        else:
+            framebuffer[:] = 0
+        line_height = SIZES[size][1]
+        for row, line in enumerate(lines):
+            x, y, text = line if isinstance(line, tuple) else (0, row * line_height, line)
+            self.draw_text(framebuffer, text, x, y, size, style)
+        return framebuffer
+
+    def overflows(self, text, resolution=DEFAULT_RESOLUTION, size="16x32"):
+        """True when `text` is wider than the screen in the given glyph size."""
+        return len(text) * SIZES[size][0] > resolution[0]
+
+
+def framebuffer_to_image(framebuffer, scale=1):
+    """Converts a framebuffer to a Pillow image (white text on black) for viewing."""
+    from PIL import Image
+    pixels = (framebuffer * 255).astype(np.uint8)
+    if scale > 1:
+        pixels = pixels.repeat(scale, axis=0).repeat(scale, axis=1)
+    return Image.fromarray(pixels, mode="L")
+
+
+def benchmark_render(image, strings, resolution=DEFAULT_RESOLUTION, size="16x32", style="normal", passes=2,
+                     chars=None):
+    """
+    Renders every string in `strings` as one screen, `passes` times (the second
+    pass runs from the text-run cache), and reports screens per second together
+    with the strings that use missing glyphs or overflow the screen width.
+    `chars` is the char list the ROM was built from (see FontRenderer).
+    """
+    renderer = FontRenderer(image, chars)
+    framebuffer = np.zeros((resolution[1], resolution[0]), dtype=np.uint8)
+    timings = []
+    for _ in range(passes):
+        start = time.perf_counter()
+        for text in strings:
+            renderer.render_screen(text.split("\n"), resolution, size, style, framebuffer)
+        timings.append(time.perf_counter() - start)
+
+    report = {
+        "strings": len(strings),
+        "cold screens/s": len(strings) / timings[0],
+        "cached screens/s": len(strings) / timings[-1],
+        "cache hits": renderer.cache_hits,
+        "cache misses": renderer.cache_misses,
+        "missing glyphs": sorted({char for text in strings for char in renderer.missing(text.replace("\n", ""))}),
+        "overflowing": [text for text in strings
+                        if any(renderer.overflows(line, resolution, size) for line in text.split("\n"))],
+    }
+    print(f"✅ Rendered {len(strings)} screens at {resolution[0]}x{resolution[1]} ({size} {style}): "
+          f"{report['cold screens/s']:.0f} screens/s cold, {report['cached screens/s']:.0f} screens/s cached")
+    if report["missing glyphs"]:
+        print(f"Missing glyphs: {''.join(report['missing glyphs'])!r}")
+    if report["overflowing"]:
+        print(f"{len(report['overflowing'])} strings overflow the screen width")
+    return report
@@ -0,0 +1,149 @@
+"""
+In-memory assembly of the combined font ROM (FontRomCombined.bin).
+
+Produces the same fixed-slot image as `write_combined_binary` in eheh.py, but
+straight from packed glyph arrays instead of re-parsing the split MIF files:
+  - 16x32 Normal    at 0x0000
+  - 16x32 Strikeout at 0x2000
+  - 32x64 High      at 0x4000 (strikeout copies from word 0x2000)
+  - 32x64 Low       at 0xC000 (strikeout copies from word 0x2000)
+The last two bytes hold the little-endian byte-sum checksum.
+"""
+import numpy as np
+
+from Glyphs import packed_from_words, section_words
+from Variants import make_variants
+
+TARGET_SIZE = 81920
+
+# Section offsets (bytes)
+BASE_OFFSETS = {
+    "16x32 Normal": 0x0000,
+    "16x32 Strikeout": 0x2000,
+    "32x64 High": 0x4000,
+    "32x64 Low": 0xC000,
+}
+
+# Word address where write_mif places the 32x64 strikeout copies
+STRIKEOUT_ADDRESS_32X64 = 0x2000
+
+# Glyph slots per bank (0x2000 bytes of 16x32 words, 0x2000 words of 32x64 halves)
+BANK_SLOTS = 128
+
+# Glyph variant stored in each bank (see Variants.py). The 32x64 banks are the
+# normal and strikeout halves of both the High and Low sections.
+DEFAULT_SECTION_VARIANTS = {
+    "16x32 Normal": "normal",
+    "16x32 Strikeout": "strikeout",
+    "32x64 Normal": "normal",
+    "32x64 Strikeout": "strikeout",
+}
+
+
+def section_ranges(target_size=TARGET_SIZE):
+    """Returns {name: (start, end)} byte ranges covering the whole combined image."""
+    bounds = sorted(BASE_OFFSETS.items(), key=lambda item: item[1])
+    ranges = {name: (start, end) for (name, start), (_, end) in zip(bounds, bounds[1:])}
+    ranges[bounds[-1][0]] = (bounds[-1][1], target_size - 2)
+    ranges["Checksum"] = (target_size - 2, target_size)
+    return ranges
+
+
+def byte_sum_checksum(data):
+    """Sums all bytes (like the C++ code) and keeps the low 16 bits."""
+    return int(np.frombuffer(bytes(data), dtype=np.uint8).sum(dtype=np.uint64)) & 0xFFFF
+
+
+def combined_banks(chars_16x32, packed_16x32, chars_32x64, packed_32x64, section_variants=None):
+    """
+    Returns the packed glyph array stored in each bank of the combined ROM.
+
+    `chars_*` / `packed_*` are the outputs of `pack_glyphs` for each canvas.
+    `section_variants` overrides entries of DEFAULT_SECTION_VARIANTS, e.g.
+    {"16x32 Strikeout": "underline"}.
+    """
+    unknown = set(section_variants or {}) - set(DEFAULT_SECTION_VARIANTS)
+    if unknown:
+        raise ValueError(f"Unknown ROM section(s): {', '.join(sorted(unknown))}")
+    section_variants = {**DEFAULT_SECTION_VARIANTS, **(section_variants or {})}
+
+    banks = {}
+    for canvas, chars, packed, (canvas_width, canvas_height) in (
+            ("16x32", chars_16x32, packed_16x32, (16, 32)),
+            ("32x64", chars_32x64, packed_32x64, (32, 64))):
+        names = [f"{canvas} Normal", f"{canvas} Strikeout"]
+        variants = make_variants([section_variants[name] for name in names],
+                                 chars, packed, canvas_width, canvas_height)
+        for name in names:
+            banks[name] = variants[section_variants[name]]
+    return banks
+
+
+def assemble_combined_image(banks, target_size=TARGET_SIZE):
+    """
+    Lays out the bank arrays from `combined_banks` at the fixed-slot offsets and
+    appends the checksum. Data that would land in the checksum bytes or beyond is
+    dropped, like the MIF path.
+    """
+    image = np.zeros(target_size, dtype=np.uint8)
+    prefill_size = target_size - 2
+
+    def place(offset, words):
+        data = np.ascontiguousarray(words, dtype=">u2").view(np.uint8).ravel()
+        end = min(offset + data.size, prefill_size)
+        if end > offset:
+            image[offset:end] = data[:end - offset]
+
+    place(BASE_OFFSETS["16x32 Normal"], section_words(banks["16x32 Normal"])[..., 0])
+    place(BASE_OFFSETS["16x32 Strikeout"], section_words(banks["16x32 Strikeout"])[..., 0])
+
+    words_32x64 = section_words(banks["32x64 Normal"])
+    strike_32x64 = section_words(banks["32x64 Strikeout"])
+    for name, half in (("32x64 High", 0), ("32x64 Low", 1)):
+        place(BASE_OFFSETS[name], words_32x64[..., half])
+        place(BASE_OFFSETS[name] + STRIKEOUT_ADDRESS_32X64 * 2, strike_32x64[..., half])
+
+    checksum = byte_sum_checksum(image[:prefill_size])
+    image[-2] = checksum & 0xFF
+    image[-1] = (checksum >> 8) & 0xFF
+    return image.tobytes()
+
+
+def build_combined_image(chars_16x32, packed_16x32, chars_32x64, packed_32x64, target_size=TARGET_SIZE,
+                         section_variants=None):
+    """Builds the combined ROM image straight from packed glyphs and returns it as bytes."""
+    banks = combined_banks(chars_16x32, packed_16x32, chars_32x64, packed_32x64, section_variants)
+    return assemble_combined_image(banks, target_size)
+
+
+def banks_from_combined_image(image, glyph_count_16x32=BANK_SLOTS, glyph_count_32x64=BANK_SLOTS):
+    """
+    Reads the bank arrays back out of a combined ROM image (e.g. FontRomCombined.bin).
+    Without glyph counts every slot of each bank is returned. The checksum bytes are
+    not glyph data: rows that would overlap them (the last 32x64 Low strikeout slot)
+    read as zero, matching what `assemble_combined_image` keeps.
+    """
+    payload = np.frombuffer(image, dtype=np.uint8)[:len(image) - 2]
+
+    def read_words(offset, glyph_count, rows):
+        data = np.zeros(glyph_count * rows * 2, dtype=np.uint8)
+        chunk = payload[offset:offset + data.size]
+        data[:chunk.size] = chunk
+        return data.view(">u2").reshape(glyph_count, rows, 1)
+
+    banks = {
+        "16x32 Normal": packed_from_words(read_words(BASE_OFFSETS["16x32 Normal"], glyph_count_16x32, 32)),
+        "16x32 Strikeout": packed_from_words(read_words(BASE_OFFSETS["16x32 Strikeout"], glyph_count_16x32, 32)),
+    }
+    for name, address in (("32x64 Normal", 0), ("32x64 Strikeout", STRIKEOUT_ADDRESS_32X64)):
+        high = read_words(BASE_OFFSETS["32x64 High"] + address * 2, glyph_count_32x64, 64)
+        low = read_words(BASE_OFFSETS["32x64 Low"] + address * 2, glyph_count_32x64, 64)
+        banks[name] = packed_from_words(np.concatenate([high, low], axis=2))
+    return banks
+
+
+def write_rom_image(image, output_file):
+    """Writes an assembled ROM image to disk."""
+    with open(output_file, "wb") as bin_file:
+        bin_file.write(image)
+    print(f"✅ ROM image written to {output_file} ({len(image)} bytes)")
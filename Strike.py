@@ -0,0 +1,153 @@
+"""
+Strikeout-derived ROM layout.
+
+`write_mif` and the combined binary store a full strikeout copy of every glyph just to
+set three rows to 0xFF. This layout stores only the normal glyphs plus a small
+descriptor of the strikeout band per canvas, so firmware can derive strikeout glyphs
+on the fly. `derive_strikeout` is the reference decoder; it reproduces the strikeout
+bitmaps of the fixed-slot ROM bit-exactly.
+
+Image layout (bytes):
+  - 16x32 Normal     at 0x0000 (same addressing as the fixed-slot ROM)
+  - 32x64 High       at 0x2000
+  - 32x64 Low        at 0x6000
+  - Strikeout Descriptor at 0xA000
+  - checksum in the last 2 bytes (little-endian byte sum)
+
+Descriptor: one count byte, then per canvas
+  canvas_width, canvas_height, glyph_count, band_start, band_rows, fill, blank_count,
+  followed by blank_count slot bytes (glyphs whose strikeout copy is all zeros, i.e. space).
+"""
+import numpy as np
+
+from Glyphs import pack_glyphs, packed_from_words, section_words, strikeout_rows
+from Rom import byte_sum_checksum
+
+STRIKE_DERIVED_SIZE = 0xA100
+
+# Section offsets (bytes)
+STRIKE_DERIVED_OFFSETS = {
+    "16x32 Normal": 0x0000,
+    "32x64 High": 0x2000,
+    "32x64 Low": 0x6000,
+    "Strikeout Descriptor": 0xA000,
+}
+
+
+def strikeout_descriptor(chars, canvas_width, canvas_height):
+    """Describes the strikeout band `write_mif` applies to a glyph set."""
+    band_start, band_end = strikeout_rows(canvas_height)
+    return {
+        "canvas_width": canvas_width,
+        "canvas_height": canvas_height,
+        "glyph_count": len(chars),
+        "band_start": band_start,
+        "band_rows": band_end - band_start,
+        "fill": 0xFF,
+        "blank_slots": [i for i, char in enumerate(chars) if char == " "],
+    }
+
+
+def encode_descriptors(descriptors):
+    """Serializes a list of strikeout descriptors."""
+    data = bytearray([len(descriptors)])
+    for d in descriptors:
+        data += bytes([d["canvas_width"], d["canvas_height"], d["glyph_count"], d["band_start"],
+                       d["band_rows"], d["fill"], len(d["blank_slots"])])
+        data += bytes(d["blank_slots"])
+    return bytes(data)
+
+
+def decode_descriptors(data):
+    """Parses the descriptor block written by `encode_descriptors`."""
+    descriptors = []
+    pos = 1
+    for _ in range(data[0]):
+        width, height, count, start, rows, fill, blank_count = data[pos:pos + 7]
+        pos += 7
+        descriptors.append({
+            "canvas_width": width,
+            "canvas_height": height,
+            "glyph_count": count,
+            "band_start": start,
+            "band_rows": rows,
+            "fill": fill,
+            "blank_slots": list(data[pos:pos + blank_count]),
+        })
+        pos += blank_count
+    return descriptors
+
+
+def derive_strikeout(packed, descriptor):
+    """
+    Reference decoder: derives strikeout glyphs from normal glyphs and a descriptor.
+    Firmware does the same per row: if band_start <= row < band_start + band_rows the
+    row is `fill`, unless the slot is listed in blank_slots (then every row is 0).
+    """
+    strikeout = packed.copy()
+    band_start = descriptor["band_start"]
+    strikeout[:, band_start:band_start + descriptor["band_rows"], :] = descriptor["fill"]
+    strikeout[descriptor["blank_slots"]] = 0x00
+    return strikeout
+
+
+def build_strike_derived_image(chars_16x32, packed_16x32, chars_32x64, packed_32x64):
+    """Builds the strikeout-derived ROM image from packed glyph arrays."""
+    image = np.zeros(STRIKE_DERIVED_SIZE, dtype=np.uint8)
+
+    def place(name, data):
+        offset = STRIKE_DERIVED_OFFSETS[name]
+        limit = min(o for o in list(STRIKE_DERIVED_OFFSETS.values()) + [STRIKE_DERIVED_SIZE - 2] if o > offset)
+        if offset + len(data) > limit:
+            raise ValueError(f"{name} section overflows its region ({len(data)} bytes)")
+        image[offset:offset + len(data)] = np.frombuffer(data, dtype=np.uint8)
+
+    words_32x64 = section_words(packed_32x64)
+    place("16x32 Normal", section_words(packed_16x32)[..., 0].astype(">u2").tobytes())
+    place("32x64 High", words_32x64[..., 0].astype(">u2").tobytes())
+    place("32x64 Low", words_32x64[..., 1].astype(">u2").tobytes())
+    place("Strikeout Descriptor", encode_descriptors([
+        strikeout_descriptor(chars_16x32, 16, 32),
+        strikeout_descriptor(chars_32x64, 32, 64),
+    ]))
+
+    checksum = byte_sum_checksum(image[:-2])
+    image[-2] = checksum & 0xFF
+    image[-1] = (checksum >> 8) & 0xFF
+    return image.tobytes()
+
+
+def decode_strike_derived_image(image):
+    """
+    Reads a strikeout-derived image back into packed arrays.
+    Returns {"16x32": (normal, strikeout), "32x64": (normal, strikeout)}.
+    """
+    descriptors = decode_descriptors(image[STRIKE_DERIVED_OFFSETS["Strikeout Descriptor"]:])
+
+    def read_words(name, glyph_count, rows):
+        words = np.frombuffer(image, dtype=">u2", count=glyph_count * rows, offset=STRIKE_DERIVED_OFFSETS[name])
+        return words.reshape(glyph_count, rows, 1)
+
+    glyphs = {}
+    for d in descriptors:
+        count, rows = d["glyph_count"], d["canvas_height"]
+        if d["canvas_width"] == 16:
+            normal = packed_from_words(read_words("16x32 Normal", count, rows))
+        else:
+            normal = packed_from_words(np.concatenate([read_words("32x64 High", count, rows),
+                                                       read_words("32x64 Low", count, rows)], axis=2))
+        glyphs[f"{d['canvas_width']}x{d['canvas_height']}"] = (normal, derive_strikeout(normal, d))
+    return glyphs
+
+
+def write_strike_derived_binary(xbm_data_16x32, xbm_data_32x64, output_file):
+    """Writes the strikeout-derived ROM for the two `generate_xbm_data` results."""
+    chars_16x32, packed_16x32 = pack_glyphs(xbm_data_16x32, 16, 32)
+    chars_32x64, packed_32x64 = pack_glyphs(xbm_data_32x64, 32, 64)
+    image = build_strike_derived_image(chars_16x32, packed_16x32, chars_32x64, packed_32x64)
+
+    with open(output_file, "wb") as bin_file:
+        bin_file.write(image)
+
+    print(f"✅ Strikeout-derived binary written to {output_file} ({len(image)} bytes)")
+    return image
@@ -0,0 +1,164 @@
+"""
+Parameter sweep and auto-fit for forced_height, max_width and threshold_value.
+
+Operators tune these by hand in the GUI (39/17 for 32x64, 28/13 for 16x32). The
+sweep evaluates a whole grid of them against the character list for one canvas:
+
+  - one master render per glyph and forced_height, exactly as `generate_xbm_data`
+    draws it (font size forced_height * 2), shared by every max_width and threshold
+  - one LANCZOS resize per glyph and target box, shared by the max_width values
+    that give the same box
+  - all thresholds applied at once to the stack of placed grayscale canvases
+
+so every grid point matches `generate_xbm_data` bit for bit. Per combination:
+
+  clipped         glyphs that do not fit the canvas (`generate_xbm_data` drops them)
+  width_overflow  glyphs squeezed horizontally because they are wider than max_width
+  grid_overflow   glyphs with ink outside the grid (the 17x39 grid for 32x64, the
+                  rows between padding_top and padding_bottom otherwise)
+  vanished        glyphs (other than the space) left without any ink
+  coverage        mean share of inked pixels in the glyph boxes
+  ink_error       relative difference between the thresholded ink and the
+                  antialiased ink mass, i.e. how much stroke weight the threshold
+                  adds or removes
+
+`best_settings` ranks the combinations: fewest clipped, grid-overflow and vanished
+glyphs, then the largest forced_height, then the fewest width-overflow glyphs,
+the smallest ink error and the smallest max_width.
+"""
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from Direct import target_box
+from Glyphs import DEFAULT_CHAR_LIST, glyph_order, grid_size, place_glyph
+
+SWEEP_DEFAULTS = {
+    "32x64": {"canvas_width": 32, "canvas_height": 64, "padding_top": 0, "padding_bottom": 2,
+              "forced_heights": range(30, 45), "max_widths": range(13, 22), "thresholds": (64, 96, 128, 160, 192)},
+    "16x32": {"canvas_width": 16, "canvas_height": 32, "padding_top": 2, "padding_bottom": 2,
+              "forced_heights": range(20, 31), "max_widths": range(9, 17), "thresholds": (64, 96, 128, 160, 192)},
+}
+
+
+def master_renders(ttf_path, chars, forced_height):
+    """{char: grayscale ink-box image} drawn as `generate_xbm_data` does at forced_height * 2."""
+    font = ImageFont.truetype(ttf_path, forced_height * 2)
+    masters = {}
+    for char in chars:
+        if char == " ":
+            continue
+        (width, height), (offset_x, offset_y) = font.font.getsize(char)
+        if width == 0 or height == 0:
+            continue
+        image = Image.new("L", (width, height), 0)
+        ImageDraw.Draw(image).text((-offset_x, -offset_y), char, font=font, fill=255)
+        masters[char] = image
+    return masters
+
+
+def grid_mask(canvas_width, canvas_height, padding_top=0, padding_bottom=0):
+    """Boolean (canvas_height, canvas_width) mask of the pixels glyphs should stay in."""
+    mask = np.zeros((canvas_height, canvas_width), dtype=bool)
+    if canvas_width == 32 and canvas_height == 64:
+        grid_width, grid_height = grid_size(canvas_width, canvas_height)
+        mask[:grid_height, :grid_width] = True
+    else:
+        mask[padding_top:canvas_height - padding_bottom] = True
+    return mask
+
+
+def sweep_canvas(ttf_path, char_list, canvas_width, canvas_height, forced_heights, max_widths, thresholds,
+                 padding_top=0, padding_bottom=0):
+    """
+    Evaluates every (forced_height, max_width, threshold_value) combination for one
+    canvas. Returns a list of result dicts (see the module docstring).
+    """
+    chars = glyph_order(char_list)
+    thresholds = np.asarray(sorted(thresholds), dtype=np.uint8)
+    outside = ~grid_mask(canvas_width, canvas_height, padding_top, padding_bottom)
+    results = []
+    for forced_height in forced_heights:
+        masters = master_renders(ttf_path, chars, forced_height)
+        resized = {}
+        for max_width in max_widths:
+            canvases = []
+            clipped = width_overflow = 0
+            for char, image in masters.items():
+                width, height = image.size
+                box = target_box(char, width, height, forced_height, max_width)
+                natural_width, _ = target_box(char, width, height, forced_height, canvas_width * 8)
+                width_overflow += natural_width > max_width
+                if (char, box) not in resized:
+                    resized[char, box] = np.asarray(image.resize(box, Image.Resampling.LANCZOS))
+                try:
+                    canvases.append(place_glyph(resized[char, box], canvas_width, canvas_height, padding_top))
+                except ValueError:
+                    clipped += 1
+            gray = np.stack(canvases) if canvases else np.zeros((0, canvas_height, canvas_width), dtype=np.uint8)
+
+            # (thresholds, glyphs, rows, columns) in one comparison
+            ink = gray[None] > thresholds[:, None, None, None]
+            ink_counts = ink.sum(axis=(2, 3))
+            box_pixels = np.array([np.count_nonzero(canvas.any(axis=1)) * np.count_nonzero(canvas.any(axis=0))
+                                   for canvas in gray], dtype=np.float64)
+            gray_mass = gray.sum(dtype=np.float64) / 255
+            grid_overflow = (ink & outside).any(axis=(2, 3)).sum(axis=1)
+            vanished = (ink_counts == 0).sum(axis=1)
+            for i, threshold in enumerate(thresholds):
+                results.append({
+                    "forced_height": forced_height,
+                    "max_width": max_width,
+                    "threshold_value": int(threshold),
+                    "clipped": clipped,
+                    "width_overflow": int(width_overflow),
+                    "grid_overflow": int(grid_overflow[i]),
+                    "vanished": int(vanished[i]),
+                    "coverage": float(np.mean(ink_counts[i] / np.maximum(box_pixels, 1))) if len(gray) else 0.0,
+                    "ink_error": float(abs(ink_counts[i].sum() - gray_mass) / max(gray_mass, 1)),
+                })
+    return results
+
+
+def rank_key(result):
+    """Sort key of a sweep result, best first (see the module docstring)."""
+    return (result["clipped"], result["grid_overflow"], result["vanished"], -result["forced_height"],
+            result["width_overflow"], result["ink_error"], result["max_width"])
+
+
+def best_settings(results):
+    """The recommended combination of a sweep."""
+    return min(results, key=rank_key)
+
+
+def sweep_report(canvas, results, top=5):
+    """Prints the `top` combinations of a sweep and returns the recommended one."""
+    ranked = sorted(results, key=rank_key)
+    print(f"{canvas}: {len(results)} combinations")
+    print("  height  width  threshold  clipped  width_ovf  grid_ovf  vanished  coverage  ink_error")
+    for r in ranked[:top]:
+        print(f"  {r['forced_height']:>6}  {r['max_width']:>5}  {r['threshold_value']:>9}  {r['clipped']:>7}  "
+              f"{r['width_overflow']:>9}  {r['grid_overflow']:>8}  {r['vanished']:>8}  {r['coverage']:>8.1%}  "
+              f"{r['ink_error']:>9.1%}")
+    return ranked[0]
+
+
+def auto_fit(ttf_path, char_list=None, canvases=None):
+    """
+    Sweeps every canvas in `canvases` ({name: SWEEP_DEFAULTS-style settings}, the
+    defaults for 32x64 and 16x32 otherwise) and returns {canvas name: best result}.
+    """
+    char_list = DEFAULT_CHAR_LIST if char_list is None else char_list
+    canvases = SWEEP_DEFAULTS if canvases is None else canvases
+    best = {}
+    start = time.perf_counter()
+    for name, settings in canvases.items():
+        results = sweep_canvas(ttf_path, char_list, **settings)
+        best[name] = sweep_report(name, results)
+    seconds = time.perf_counter() - start
+    print(f"✅ Sweep finished in {seconds:.2f} s")
+    for name, r in best.items():
+        print(f"  {name}: forced_height={r['forced_height']} max_width={r['max_width']} "
+              f"threshold_value={r['threshold_value']}")
+    return best
@@ -0,0 +1,325 @@
+"""
+Chunked serial uploader for the combined font ROM (FontRomCombined.bin).
+
+The transport is the line protocol of the UART line-echo firmware in Prot.c: the
+board collects characters up to CR/LF in a 64-byte buffer and echoes the line back.
+The echo is the acknowledgement, so every chunk is sent as one short ASCII line:
+
+  W<offset: 5 hex digits><data: hex><sum of data bytes: 2 hex digits>
+
+With RX_BUF_SIZE = 64 a line carries at most MAX_CHUNK_SIZE bytes. Up to `window`
+lines are in flight; a wrong or missing echo makes the uploader go back to the
+first unacknowledged chunk. After the last chunk the host sends C<checksum> and
+expects the board's own byte-sum of its copy back.
+
+Progress is kept in a JSON state file next to the image: an interrupted upload
+resumes where it stopped, and a new image only resends the sections (see
+`Rom.section_ranges`) whose contents changed since the last complete upload.
+"""
+import hashlib
+import json
+import os
+import select
+import threading
+import time
+import tty
+from collections import deque
+
+from Ecount import open_serial, write_all
+from Rom import TARGET_SIZE, byte_sum_checksum, section_ranges
+
+# Prot.c line buffer; one byte is kept for the terminating NUL
+RX_BUF_SIZE = 64
+MAX_LINE_LENGTH = RX_BUF_SIZE - 1
+MAX_CHUNK_SIZE = (MAX_LINE_LENGTH - 8) // 2
+DEFAULT_CHUNK_SIZE = 24
+
+
+def format_chunk(offset, data):
+    """Formats one chunk as an upload line (without the line terminator)."""
+    return f"W{offset:05X}{data.hex().upper()}{sum(data) & 0xFF:02X}".encode("ascii")
+
+
+def parse_chunk(line):
+    """Returns (offset, data) for a valid upload line, None otherwise."""
+    try:
+        offset = int(line[1:6], 16)
+        data = bytes.fromhex(line[6:-2].decode("ascii"))
+        chunk_sum = int(line[-2:], 16)
+    except ValueError:
+        return None
+    if not line.startswith(b"W") or sum(data) & 0xFF != chunk_sum:
+        return None
+    return offset, data
+
+
+def plan_chunks(ranges, chunk_size):
+    """Splits (start, end) byte ranges into (offset, length) chunks."""
+    return [(offset, min(chunk_size, end - offset))
+            for start, end in ranges
+            for offset in range(start, end, chunk_size)]
+
+
+def section_hashes(image):
+    """SHA-1 of every section of the combined image."""
+    return {name: hashlib.sha1(image[start:end]).hexdigest()
+            for name, (start, end) in section_ranges(len(image)).items()}
+
+
+def load_state(state_file):
+    if state_file and os.path.exists(state_file):
+        with open(state_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {"device_sections": {}, "in_progress": None}
+
+
+def save_state(state_file, state):
+    if not state_file:
+        return
+    temp_file = state_file + ".tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(temp_file, state_file)
+
+
+class LineReader:
+    """Reads CR/LF terminated lines from a non-blocking fd."""
+
+    def __init__(self, fd):
+        self.fd = fd
+        self.buffer = bytearray()
+
+    def read_line(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            end = self.buffer.find(b"\n")
+            if end >= 0:
+                line = bytes(self.buffer[:end]).rstrip(b"\r")
+                del self.buffer[:end + 1]
+                if line:
+                    return line
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([self.fd], [], [], remaining)[0]:
+                raise TimeoutError("No echo from the device")
+            try:
+                self.buffer += os.read(self.fd, 4096)
+            except BlockingIOError:
+                continue
+
+    def drain(self, quiet=0.05):
+        """Discards input until the line has been quiet for `quiet` seconds."""
+        self.buffer.clear()
+        while select.select([self.fd], [], [], quiet)[0]:
+            try:
+                os.read(self.fd, 4096)
+            except BlockingIOError:
+                continue
+
+
+def upload_rom(port, image, state_file=None, chunk_size=DEFAULT_CHUNK_SIZE, window=8, timeout=0.5,
+               retries=3, baudrate=115200):
+    """
+    Uploads `image` to the board on `port` (a device path or an open fd).
+    Returns a report with the bytes sent, chunk counts, retries and elapsed time.
+    """
+    if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+        raise ValueError(f"chunk_size must be between 1 and {MAX_CHUNK_SIZE} bytes")
+    image = bytes(image)
+    image_hash = hashlib.sha1(image).hexdigest()
+    hashes = section_hashes(image)
+    state = load_state(state_file)
+
+    progress = state.get("in_progress")
+    if progress and progress["image"] == image_hash and progress["chunk_size"] == chunk_size:
+        ranges, acked = progress["ranges"], progress["acked"]
+    else:
+        changed = [name for name, digest in hashes.items() if state["device_sections"].get(name) != digest]
+        ranges = [section_ranges(len(image))[name] for name in changed]
+        acked = 0
+        # Sections we are about to overwrite are unknown on the device until we finish
+        for name in changed:
+            state["device_sections"][name] = None
+    chunks = plan_chunks(ranges, chunk_size)
+    state["in_progress"] = {"image": image_hash, "chunk_size": chunk_size, "ranges": ranges, "acked": acked}
+    save_state(state_file, state)
+
+    fd = open_serial(port, baudrate) if isinstance(port, str) else port
+    reader = LineReader(fd)
+    start_time = time.perf_counter()
+    resumed_at = acked
+    failures = 0
+    bytes_sent = 0
+    try:
+        while True:
+            in_flight = deque()
+            sent = acked
+            try:
+                while acked < len(chunks):
+                    while sent < len(chunks) and sent - acked < window:
+                        offset, length = chunks[sent]
+                        line = format_chunk(offset, image[offset:offset + length])
+                        write_all(fd, line + b"\n")
+                        in_flight.append(line)
+                        bytes_sent += length
+                        sent += 1
+                    if reader.read_line(timeout) != in_flight.popleft():
+                        raise ValueError(f"Echo mismatch for chunk at 0x{chunks[acked][0]:05X}")
+                    acked += 1
+                    if acked % window == 0:
+                        state["in_progress"]["acked"] = acked
+                        save_state(state_file, state)
+
+                expected = f"C{byte_sum_checksum(image):04X}".encode("ascii")
+                write_all(fd, expected + b"\n")
+                answer = reader.read_line(timeout)
+                if answer != expected:
+                    # The board's copy differs somewhere: resend everything
+                    state["device_sections"] = {}
+                    state["in_progress"] = None
+                    raise RuntimeError(f"Final checksum mismatch: sent {expected.decode()}, "
+                                       f"board answered {answer.decode(errors='replace')}")
+                break
+            except (TimeoutError, ValueError):
+                failures += 1
+                if failures > retries:
+                    raise
+                reader.drain()
+    finally:
+        if state["in_progress"] is not None:
+            state["in_progress"]["acked"] = acked
+        save_state(state_file, state)
+        if isinstance(port, str):
+            os.close(fd)
+
+    state["device_sections"] = hashes
+    state["in_progress"] = None
+    save_state(state_file, state)
+
+    elapsed = time.perf_counter() - start_time
+    report = {
+        "chunks": len(chunks),
+        "resumed at chunk": resumed_at,
+        "bytes sent": bytes_sent,
+        "retries": failures,
+        "seconds": elapsed,
+        "bytes/s": bytes_sent / elapsed if elapsed else 0.0,
+    }
+    print(f"✅ Uploaded {bytes_sent} bytes in {len(chunks) - resumed_at} chunks "
+          f"({elapsed:.2f} s, {failures} retries, checksum verified)")
+    return report
+
+
+class LineEchoEmulator:
+    """
+    Pseudo-terminal model of the Prot.c line-echo firmware: lines up to
+    MAX_LINE_LENGTH characters are echoed with CR/LF, longer input is truncated.
+    Upload lines are also written into `memory`, and a C line is answered with the
+    byte-sum of `memory`, which is what an uploading firmware would do.
+    `fail_after` stops answering after that many lines to simulate a lost link;
+    `baudrate` throttles the link to real UART speed.
+    """
+
+    def __init__(self, memory_size=TARGET_SIZE, baudrate=None, fail_after=None):
+        self.memory = bytearray(memory_size)
+        self.baudrate = baudrate
+        self.fail_after = fail_after
+        self.lines = 0
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        self.port_name = os.ttyname(self.slave)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        os.close(self.master)
+        os.close(self.slave)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _handle_line(self, line):
+        self.lines += 1
+        if self.fail_after is not None and self.lines > self.fail_after:
+            return b""
+        if line.startswith(b"C"):
+            return f"C{byte_sum_checksum(self.memory):04X}".encode("ascii") + b"\r\n"
+        chunk = parse_chunk(line)
+        if chunk:
+            offset, data = chunk
+            self.memory[offset:offset + len(data)] = data
+        return line + b"\r\n"
+
+    def _run(self):
+        rx_buffer = bytearray()
+        while not self._stop.is_set():
+            if not select.select([self.master], [], [], 0.05)[0]:
+                continue
+            try:
+                received = os.read(self.master, 4096)
+            except OSError:
+                return
+            for byte in received:
+                if byte in b"\r\n":
+                    if rx_buffer:
+                        reply = self._handle_line(bytes(rx_buffer))
+                        if self.baudrate:
+                            time.sleep((len(rx_buffer) + 1 + len(reply)) * 10 / self.baudrate)
+                        write_all(self.master, reply)
+                        rx_buffer.clear()
+                elif len(rx_buffer) < MAX_LINE_LENGTH:
+                    rx_buffer.append(byte)
+
+
+def benchmark_upload(image, chunk_sizes=(8, 16, DEFAULT_CHUNK_SIZE), windows=(1, 4, 16), baudrate=None,
+                     state_dir="."):
+    """
+    Benchmarks full uploads of `image` against the pty emulator for every chunk
+    size and window, then a section-delta upload and an interrupted-and-resumed one.
+    """
+    state_file = os.path.join(state_dir, "upload_benchmark_state.json")
+    rows = []
+    for chunk_size in chunk_sizes:
+        for window in windows:
+            if os.path.exists(state_file):
+                os.remove(state_file)
+            with LineEchoEmulator(len(image), baudrate) as emulator:
+                report = upload_rom(emulator.port_name, image, state_file, chunk_size, window)
+                if bytes(emulator.memory) != bytes(image):
+                    raise RuntimeError(f"Device memory differs from the image after the chunk={chunk_size} "
+                                       f"window={window} upload")
+            rows.append({"case": f"full chunk={chunk_size} window={window}", **report})
+
+    with LineEchoEmulator(len(image), baudrate) as emulator:
+        os.remove(state_file)
+        upload_rom(emulator.port_name, image, state_file)
+        changed = bytearray(image)
+        changed[section_ranges(len(image))["32x64 Low"][0]] ^= 0x01
+        changed[-2:] = byte_sum_checksum(changed[:-2]).to_bytes(2, "little")
+        rows.append({"case": "delta (one 32x64 Low byte)", **upload_rom(emulator.port_name, changed, state_file)})
+
+        emulator.memory[:] = bytes(len(image))
+        os.remove(state_file)
+        emulator.fail_after = emulator.lines + 500
+        try:
+            upload_rom(emulator.port_name, image, state_file, timeout=0.1, retries=0)
+        except TimeoutError:
+            pass
+        emulator.fail_after = None
+        rows.append({"case": "resume after interruption", **upload_rom(emulator.port_name, image, state_file)})
+        if bytes(emulator.memory) != bytes(image):
+            raise RuntimeError("Device memory differs from the image after the resumed upload")
+    os.remove(state_file)
+
+    for row in rows:
+        print(f"{row['case']:<32} {row['bytes sent']:>7} bytes  {row['seconds']:7.3f} s  {row['bytes/s']:>10.0f} B/s")
+    return rows
@@ -0,0 +1,79 @@
+"""
+Glyph variant engine.
+
+Works on the packed glyph array from `pack_glyphs` (glyphs, rows, row bytes) and
+derives a whole variant set in a few NumPy operations instead of copying every glyph
+row by row. Row bytes are XBM ordered: bit 0 of byte 0 is the leftmost pixel.
+
+Variants:
+  - normal           the glyphs unchanged
+  - strikeout        `write_mif` strikeout: 3 rows of 0xFF around canvas_height // 2,
+                     space stays blank
+  - strikeout_grid   `write_xbm` strikeout: band centered on the placement grid,
+                     applied to every glyph
+  - underline        2 rows of 0xFF just below the placement grid
+  - inverse          inverse video over the whole cell
+  - bold             1-pixel dilation to the right
+"""
+import numpy as np
+
+from Glyphs import grid_size, strikeout_rows
+
+
+def _band(packed, start, rows):
+    variant = packed.copy()
+    variant[:, start:start + rows, :] = 0xFF
+    return variant
+
+
+def normal(chars, packed, canvas_width, canvas_height):
+    return packed.copy()
+
+
+def strikeout(chars, packed, canvas_width, canvas_height):
+    start, end = strikeout_rows(canvas_height)
+    variant = _band(packed, start, end - start)
+    variant[[i for i, char in enumerate(chars) if char == " "]] = 0x00
+    return variant
+
+
+def strikeout_grid(chars, packed, canvas_width, canvas_height):
+    start, end = strikeout_rows(grid_size(canvas_width, canvas_height)[1])
+    return _band(packed, start, end - start)
+
+
+def underline(chars, packed, canvas_width, canvas_height):
+    start = min(grid_size(canvas_width, canvas_height)[1], canvas_height - 2)
+    return _band(packed, start, 2)
+
+
+def inverse(chars, packed, canvas_width, canvas_height):
+    return np.invert(packed)
+
+
+def bold(chars, packed, canvas_width, canvas_height):
+    pixels = np.unpackbits(packed, axis=-1, bitorder="little")
+    pixels[..., 1:] |= pixels[..., :-1]
+    return np.packbits(pixels, axis=-1, bitorder="little")
+
+
+VARIANTS = {
+    "normal": normal,
+    "strikeout": strikeout,
+    "strikeout_grid": strikeout_grid,
+    "underline": underline,
+    "inverse": inverse,
+    "bold": bold,
+}
+
+
+def make_variant(name, chars, packed, canvas_width, canvas_height):
+    """Returns the packed glyph array for one variant of the whole glyph set."""
+    if name not in VARIANTS:
+        raise ValueError(f"Unknown glyph variant '{name}' (expected one of {', '.join(VARIANTS)})")
+    return VARIANTS[name](chars, packed, canvas_width, canvas_height)
+
+
+def make_variants(names, chars, packed, canvas_width, canvas_height):
+    """Returns {name: packed} for each requested variant, computing each name once."""
+    return {name: make_variant(name, chars, packed, canvas_width, canvas_height) for name in dict.fromkeys(names)}
@@ -0,0 +1,63 @@
+"""
+Golden-output gate: every new writer must reproduce the legacy outputs byte for
+byte (see Golden.py).
+
+The checks render tests/fonts/Lato-Regular.ttf (SIL Open Font License 1.1, see
+tests/fonts/OFL.txt) unless GOLDEN_FONT names another TTF. Stage times and
+memory are printed (pytest -s) but only fail the run with GOLDEN_BUDGETS set,
+since wall-clock budgets depend on the machine:
+    GOLDEN_BUDGETS=1 python -m pytest -q -s tests
+"""
+import os
+
+import pytest
+
+import Golden
+
+FONT = os.environ.get("GOLDEN_FONT") or os.path.join(os.path.dirname(__file__), "fonts", "Lato-Regular.ttf")
+ENFORCE_BUDGETS = bool(os.environ.get("GOLDEN_BUDGETS"))
+
+
+def test_new_writers_match_goldens(tmp_path):
+    golden_dir = str(tmp_path / "golden")
+    manifest = Golden.make_golden(FONT, golden_dir)
+    assert sorted(manifest["files"]) == sorted(Golden.golden_files())
+
+    results = Golden.check_golden(FONT, golden_dir, work_dir=str(tmp_path / "work"),
+                                  enforce_budgets=ENFORCE_BUDGETS)
+    assert [result["stage"] for result in results] == list(Golden.DEFAULT_BUDGETS)
+    assert not any(result["mismatches"] for result in results)
+
+
+def test_changed_render_is_caught(tmp_path):
+    golden_dir = str(tmp_path / "golden")
+    Golden.make_golden(FONT, golden_dir)
+    generate_xbm_data = Golden.load_legacy("eheh.py")["generate_xbm_data"]
+
+    def thinner(*args, **kwargs):
+        return generate_xbm_data(*args, threshold_value=200, **kwargs)
+
+    with pytest.raises(AssertionError, match="differs from the golden"):
+        Golden.check_golden(FONT, golden_dir, work_dir=str(tmp_path / "work"), generate_xbm_data=thinner,
+                            enforce_budgets=False)
+
+
+def test_over_budget_stage_is_reported_not_failed(tmp_path):
+    golden_dir = str(tmp_path / "golden")
+    Golden.make_golden(FONT, golden_dir)
+    budgets = {"rom": (0.0, 0)}
+
+    results = Golden.check_golden(FONT, golden_dir, work_dir=str(tmp_path / "work"), budgets=budgets,
+                                  enforce_budgets=False)
+    assert next(result for result in results if result["stage"] == "rom")["overruns"]
+
+    with pytest.raises(AssertionError, match="rom: .* over the 0.0 s budget"):
+        Golden.check_golden(FONT, golden_dir, work_dir=str(tmp_path / "work"), budgets=budgets)
+
+
+def test_legacy_functions_load_without_gui():
+    eheh = Golden.load_legacy("eheh.py")
+    for name in ("generate_xbm_data", "write_xbm", "write_mif", "write_combined_binary"):
+        assert callable(eheh[name])
+    for script, _ in Golden.LEGACY_BINARIES.values():
+        assert callable(Golden.load_legacy(script)["write_combined_binary"])
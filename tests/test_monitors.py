@@ -0,0 +1,45 @@
+"""
+Input switching against pty emulators (see Monitors.py and Ecount.py).
+"""
+import asyncio
+
+from Ecount import (CMD_GET_FIRMWARE_VERSION, DP_INPUT, HDMI_INPUT, INPUT_NOT_SWITCHED, EcountEmulator,
+                    build_response)
+from Monitors import MonitorController
+
+
+class BackToBackEmulator(EcountEmulator):
+    """Sends the switch-complete frame in the same write as the INPUT_NOT_SWITCHED version answer."""
+
+    def __init__(self):
+        super().__init__(switch_delay=60)
+        self.selected = None
+
+    def set_adjuster(self, data):
+        self.selected = data[1]
+        return super().set_adjuster(data)
+
+    def _send(self, frame):
+        if frame[2] == CMD_GET_FIRMWARE_VERSION and self.input_type == INPUT_NOT_SWITCHED:
+            self.input_type = self.selected
+            frame += build_response(self.node, CMD_GET_FIRMWARE_VERSION, self.version_data(b""))
+        super()._send(frame)
+
+
+def test_switch_confirmed_by_frame_behind_the_version_answer():
+    emulators = [BackToBackEmulator().start() for _ in range(4)]
+    try:
+        async def run():
+            async with MonitorController([emulator.port_name for emulator in emulators]) as controller:
+                results = [await controller.toggle_inputs() for _ in range(3)]
+                return results, controller.current_input, await controller.get_versions()
+
+        results, current_input, versions = asyncio.run(run())
+    finally:
+        for emulator in emulators:
+            emulator.stop()
+
+    assert all(result is True for toggle in results for result in toggle.values())
+    assert set(current_input.values()) == {DP_INPUT}
+    assert set(versions.values()) == {DP_INPUT}
+    assert HDMI_INPUT not in {emulator.input_type for emulator in emulators}